@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, send_file
 import os
 import sys
 import json
@@ -9,13 +9,18 @@ import logging
 from datetime import datetime
 import subprocess
 import tempfile
+import shutil
 import base64
 import uuid
 import asyncio
 import edge_tts
 import ftplib
 import io
+import requests
 from concurrent.futures import ThreadPoolExecutor
+from video_render import render_video, validate_params, check_ffmpeg, get_request_key, VideoRenderError, OUTPUT_FILENAME
+from render_cache import RenderCache, make_key
+from video_jobs import JobStore, JobQueue, QueueFullError, DONE
 
 # 기존 AutoBlog 모듈 임포트 (수정 필요)
 try:
@@ -77,7 +82,7 @@ def upload_to_ftp(file_content, remote_filename, file_mode='binary'):
     FTP 서버에 파일 업로드
 
     Args:
-        file_content: 파일 내용 (bytes 또는 str)
+        file_content: 파일 내용 (bytes 또는 str) 또는 바이너리 모드로 연 파일 객체 (메모리에 올리지 않고 나눠서 전송)
         remote_filename: 원격 파일명
         file_mode: 전송 모드 ('binary' 또는 'ascii')
 
@@ -89,6 +94,13 @@ def upload_to_ftp(file_content, remote_filename, file_mode='binary'):
         ftp.connect(FTP_CONFIG['host'], FTP_CONFIG['port'])
         ftp.login(FTP_CONFIG['username'], FTP_CONFIG['password'])
 
+        # 파일 객체는 그대로 나눠서 전송
+        if hasattr(file_content, 'read'):
+            ftp.storbinary(f'STOR {remote_filename}', file_content)
+            ftp.quit()
+            logger.info(f"FTP 업로드 성공: {remote_filename}")
+            return f"ftp://{FTP_CONFIG['host']}/{remote_filename}"
+
         # 파일 내용을 bytes로 변환
         if isinstance(file_content, str):
             file_bytes = file_content.encode('utf-8')
@@ -371,6 +383,9 @@ def get_api_info():
             "/api/content/generate",
             "/api/searchconsole/submit",
             "/api/coupang/search",
+            "/api/video/generate",
+            "/api/video/jobs/<job_id>",
+            "/api/video/jobs/<job_id>/result",
             "/api/info"
         ],
         "features": [
@@ -472,309 +487,144 @@ def test_post():
 # 🎬 FFmpeg 비디오 처리 엔드포인트
 # ===========================
 
+# 비디오/TTS 결과 캐시. 같은 요청은 다시 렌더링하지 않음 (RENDER_CACHE_DIR, RENDER_CACHE_MAX_MB)
+render_cache = RenderCache(
+    os.environ.get('RENDER_CACHE_DIR', 'render_cache'),
+    max_bytes=int(float(os.environ.get('RENDER_CACHE_MAX_MB', '2048')) * 1024 * 1024)
+)
+
+def run_video_job(job_id, data, progress):
+    """워커 스레드에서 비디오를 렌더링하고 FTP 에 업로드합니다. 결과는 작업 저장소에 기록됩니다."""
+    rendered = render_video(data, video_job_store.get_dir(job_id), progress, cache=render_cache)
+    # 다음에는 이미지를 받기 전에 요청만으로 캐시를 찾을 수 있도록 별칭 저장 (모든 입력이 data: URL 인 경우만)
+    request_key = get_request_key(data)
+    if request_key is not None:
+        render_cache.alias(request_key, rendered['cache_key'])
+    if rendered['cached']:
+        # 같은 결과가 이미 FTP 에 업로드되어 있음
+        return dict(rendered['cached_data'], metadata=rendered['metadata'], cached=True)
+    metadata = rendered['metadata']
+
+    # FTP에 비디오 파일 저장
+    progress(90, 'FTP 업로드 중')
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    audio_tag = "with_audio" if metadata['has_audio'] else "no_audio"
+    ftp_filename = f"video_{timestamp}_{metadata['resolution']}_{audio_tag}.mp4"
+    # 파일 전체를 메모리에 올리지 않고 디스크에서 나눠서 업로드
+    with open(rendered['path'], 'rb') as f:
+        ftp_url = upload_to_ftp(f, ftp_filename, 'binary')
+    metadata['ftp_file'] = ftp_filename
+
+    result = {
+        "ftp_url": ftp_url,  # FTP 저장 경로
+        "metadata": metadata,
+        "ffmpeg_log": rendered['ffmpeg_log']
+    }
+    render_cache.put(rendered['cache_key'], rendered['path'], result)
+    return result
+
+# 비디오 작업 큐. 렌더링은 요청 스레드가 아닌 별도 워커 풀에서 실행 (동시 렌더링 수: VIDEO_JOB_WORKERS)
+video_job_store = JobStore()
+video_job_queue = JobQueue(
+    video_job_store,
+    run_video_job,
+    max_workers=int(os.environ.get('VIDEO_JOB_WORKERS', '1')),
+    max_pending=int(os.environ.get('VIDEO_JOB_MAX_PENDING', '20'))
+)
+
+def get_video_job_response(job):
+    """작업 상태 응답. 완료된 작업은 메타데이터와 다운로드 URL 을 함께 반환 (비디오 본문은 /result 로 받음)"""
+    response = {
+        "success": job['state'] != 'failed',
+        "job_id": job['id'],
+        "state": job['state'],
+        "progress": job['progress'],
+        "message": job['message'],
+        "created_at": datetime.fromtimestamp(job['created_at']).isoformat(),
+        "updated_at": datetime.fromtimestamp(job['updated_at']).isoformat(),
+    }
+    if job['state'] == DONE and job['result']:
+        response.update(job['result'])
+        response["video_url"] = f"/api/video/jobs/{job['id']}/result"
+    if job.get('error'):
+        response["error"] = job['error']
+        response["details"] = job.get('details')
+    return response
+
 @app.route('/api/video/generate', methods=['POST'])
 def generate_video():
-    """이미지 배열을 비디오로 변환 (서버 측 FFmpeg)"""
+    """이미지 배열을 비디오로 변환하는 작업을 큐에 넣고 작업 ID 를 반환 (서버 측 FFmpeg)"""
     try:
         data = request.get_json()
-        if not data:
-            return jsonify({"success": False, "error": "No JSON data provided"}), 400
-
-        images = data.get('images', [])
-        duration = data.get('duration', 3)
-        fps = data.get('fps', 30)
-        quality = data.get('quality', 'medium')
-        resolution = data.get('resolution', 'landscape')  # landscape, portrait, square
-        audio_url = data.get('audio_url', '')  # 오디오 파일 (선택사항)
-        sync_audio = data.get('sync_audio', False)  # 오디오 싱크 활성화
-        target_duration = data.get('target_duration', None)  # 목표 영상 길이
-        total_duration = data.get('total_duration', None)  # 전체 영상 길이
-
-        if not images or len(images) == 0:
-            return jsonify({"success": False, "error": "이미지가 필요합니다"}), 400
+        validate_params(data)
 
         # FFmpeg 설치 확인
-        try:
-            subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-        except (subprocess.CalledProcessError, FileNotFoundError):
+        if not check_ffmpeg():
             return jsonify({
                 "success": False,
                 "error": "FFmpeg가 설치되지 않았습니다"
             }), 500
 
-        # 임시 디렉토리 생성
-        temp_dir = tempfile.mkdtemp()
-
-        # 오디오 싱크를 위한 동적 영상 길이 계산
-        if sync_audio and total_duration:
-            # 오디오 길이에 맞춰 각 장면의 길이 계산
-            scene_duration = max(1, total_duration / len(images))
-            duration = scene_duration
-            logger.info(f"Audio sync enabled: {len(images)} images, {total_duration}s total, {scene_duration:.2f}s per scene")
-        elif target_duration:
-            # 목표 길이에 맞춰 장면 길이 계산
-            scene_duration = max(1, target_duration / len(images))
-            duration = scene_duration
-            logger.info(f"Target duration: {len(images)} images, {target_duration}s total, {scene_duration:.2f}s per scene")
-
-        try:
-            # 이미지 파일 저장
-            image_paths = []
-            for i, image_data in enumerate(images):
-                if image_data.startswith('data:image'):
-                    # Base64 이미지 디코딩
-                    header, encoded = image_data.split(',', 1)
-                    file_extension = header.split('/')[1].split(';')[0]
-
-                    image_path = os.path.join(temp_dir, f'input_{i}.{file_extension}')
-
-                    with open(image_path, 'wb') as f:
-                        f.write(base64.b64decode(encoded))
-
-                    image_paths.append(image_path)
-                elif image_data.startswith('http'):
-                    # URL 이미지 다운로드
-                    try:
-                        response = requests.get(image_data, timeout=10)
-                        if response.status_code == 200:
-                            # 파일 확장자 결정
-                            content_type = response.headers.get('content-type', 'image/jpeg')
-                            if 'jpeg' in content_type or 'jpg' in content_type:
-                                file_extension = 'jpg'
-                            elif 'png' in content_type:
-                                file_extension = 'png'
-                            elif 'webp' in content_type:
-                                file_extension = 'webp'
-                            else:
-                                file_extension = 'jpg'  # 기본값
-
-                            image_path = os.path.join(temp_dir, f'input_{i}.{file_extension}')
-
-                            with open(image_path, 'wb') as f:
-                                f.write(response.content)
-
-                            image_paths.append(image_path)
-                            logger.info(f"Downloaded image {i} from {image_data}")
-                        else:
-                            logger.error(f"Failed to download image {i}: HTTP {response.status_code}")
-                    except Exception as e:
-                        logger.error(f"Error downloading image {i}: {str(e)}")
-                else:
-                    logger.warning(f"Unsupported image format for image {i}: {image_data[:50]}...")
-
-            # 이미지 처리 확인
-            if not image_paths:
-                return jsonify({
-                    "success": False,
-                    "error": f"이미지 처리 실패: {len(images)}개 중 0개만 처리됨"
-                }), 400
-
-            logger.info(f"Successfully processed {len(image_paths)} images")
-
-            # 해상도 설정
-            resolution_map = {
-                'landscape': (1920, 1080),  # 16:9 가로
-                'portrait': (1080, 1920),   # 9:16 세로 (숏츠)
-                'square': (1080, 1080)      # 1:1 정사각형
-            }
-            width, height = resolution_map.get(resolution, (1920, 1080))
-
-            # FFmpeg 명령어 생성
-            video_only_path = os.path.join(temp_dir, 'video_only.mp4')
-            output_path = os.path.join(temp_dir, 'output_with_audio.mp4')
-
-            # 1. 먼저 이미지로 비디오만 생성
-            input_params = []
-            for i, path in enumerate(image_paths):
-                input_params.extend(['-loop', '1', '-t', str(duration), '-i', path])
-
-            # 필터 설정
-            filter_complex = []
-            filter_parts = []
-
-            for i, path in enumerate(image_paths):
-                # 선택된 해상도로 스케일 및 패딩
-                filter_complex.append(f'[{i}:v]scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={fps}[v{i}]')
-                filter_parts.append(f'[v{i}]')
-
-            # 이미지 연결
-            concat_filter = f'{"".join(filter_parts)}concat=n={len(image_paths)}:v=1[out]'
-            filter_complex.append(concat_filter)
-
-            # 품질 설정
-            crf_map = {'low': 28, 'medium': 23, 'high': 18}
-            crf = crf_map.get(quality, 23)
-
-            # 계산된 총 영상 길이
-            calculated_video_duration = len(images) * duration
-
-            # 비디오만 생성하는 FFmpeg 명령어
-            video_cmd = [
-                'ffmpeg',
-                *input_params,
-                '-filter_complex', ';'.join(filter_complex),
-                '-map', '[out]',
-                '-c:v', 'libx264',
-                '-preset', 'medium',
-                '-crf', str(crf),
-                '-pix_fmt', 'yuv420p',
-                '-r', str(fps),
-                '-t', str(calculated_video_duration),
-                video_only_path
-            ]
-
-            logger.info(f"Video-only FFmpeg command: {' '.join(video_cmd)}")
-            result = subprocess.run(video_cmd, capture_output=True, text=True, check=True)
-
-            # 2. 오디오가 있으면 오디오와 비디오 결합 (MoviePy 완전 통합)
-            if audio_url:
-                audio_path = os.path.join(temp_dir, 'audio.mp3')
-                processed_audio_path = os.path.join(temp_dir, 'processed_audio.mp3')
-
-                # 오디오 파일 저장
-                if audio_url.startswith('data:audio'):
-                    header, encoded = audio_url.split(',', 1)
-                    with open(audio_path, 'wb') as f:
-                        f.write(base64.b64decode(encoded))
-
-                # 라이트웨이트 오디오 전처리 (Railway 최적화)
-                try:
-                    # 1단계: 기본 오디오 최적화만 (Railway 부하 감소)
-                    audio_process_cmd = [
-                        'ffmpeg',
-                        '-i', audio_path,
-                        '-vn',  # 비디오 없음
-                        '-af',
-                        # 필수적인 최소한의 처리만
-                        'volume=2.0',  # 볼륨만 2배 증가 (단순하고 빠름)
-                        '-ar', '44100',  # 표준 샘플 레이트
-                        '-ac', '2',      # 스테레오
-                        '-c:a', 'mp3',   # 가볍고 호환성 좋은 포맷
-                        '-b:a', '128k',  # 적정 비트레이트 (용량 절약)
-                        '-y',            # 덮어쓰기
-                        processed_audio_path
-                    ]
-
-                    logger.info(f"Lightweight audio processing: {' '.join(audio_process_cmd)}")
-                    process_result = subprocess.run(audio_process_cmd, capture_output=True, text=True, check=True, timeout=30)  # 30초 타임아웃
-
-                    # 전처리된 오디오 사용
-                    if os.path.exists(processed_audio_path):
-                        audio_path = processed_audio_path
-                        logger.info("Lightweight audio processing completed")
-
-                except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
-                    logger.warning(f"Audio processing failed: {e}, using original audio")
-                    # 전처리 실패 시 원본 오디오 사용 (실패 방지)
-
-                # 오디오 길이 확인 및 로깅
-                try:
-                    # ffprobe로 오디오 길이 확인
-                    probe_cmd = [
-                        'ffprobe', '-v', 'quiet', '-show_entries', 'format=duration',
-                        '-of', 'csv=p=0', audio_path
-                    ]
-                    probe_result = subprocess.run(probe_cmd, capture_output=True, text=True)
-                    if probe_result.returncode == 0:
-                        audio_duration = float(probe_result.stdout.strip())
-                        logger.info(f"Audio duration detected: {audio_duration:.2f}s")
-
-                        # 오디오 싱크가 활성화된 경우, 비디오 길이를 오디오 길이에 정확히 맞춤
-                        if sync_audio:
-                            logger.info(f"Syncing video duration {calculated_video_duration:.2f}s to audio duration {audio_duration:.2f}s")
-                except Exception as e:
-                    logger.warning(f"Could not probe audio duration: {e}")
-
-                # MoviePy 스타일 효율적 오디오+비디오 결합 FFmpeg 명령어
-                audio_cmd = [
-                    'ffmpeg',
-                    '-i', video_only_path,  # 비디오 입력
-                    '-i', audio_path,        # 오디오 입력
-                    '-c:v', 'copy',          # 비디오 코덱 복사 (품질 유지)
-                    '-c:a', 'aac',           # AAC 코덱 (호환성)
-                    '-b:a', '192k',          # 적정 비트레이트 (품질/용량 균형)
-                    '-ar', '44100',          # 표준 샘플 레이트 (안정성)
-                    '-ac', '2',              # 스테레오
-                    '-movflags', '+faststart',  # 웹 스트리밍 최적화
-                ]
-
-                if sync_audio:
-                    # 오디오 싱크 모드: 오디오 길이에 맞춰 비디오 조정
-                    audio_cmd.extend([
-                        '-t', str(audio_duration) if 'audio_duration' in locals() else str(calculated_video_duration),
-                        '-async', '1',  # 오디오 싱크 보정
-                    ])
-                else:
-                    # 기본 모드: 더 짧은 쪽에 맞춤
-                    audio_cmd.append('-shortest')
-
-                audio_cmd.append(output_path)
-
-                logger.info(f"Audio+Video FFmpeg command: {' '.join(audio_cmd)}")
-                result = subprocess.run(audio_cmd, capture_output=True, text=True, check=True)
-            else:
-                # 오디오가 없으면 비디오만 출력
-                import shutil
-                shutil.move(video_only_path, output_path)
-
-            # 결과 비디오를 base64로 변환
-            with open(output_path, 'rb') as f:
-                video_data = f.read()
-
-            video_base64 = base64.b64encode(video_data).decode('utf-8')
-            video_url = f"data:video/mp4;base64,{video_base64}"
-
-            # FTP에 비디오 파일 저장
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            resolution_tag = f"{width}x{height}"
-            audio_tag = "with_audio" if audio_url else "no_audio"
-            ftp_filename = f"video_{timestamp}_{resolution_tag}_{audio_tag}.mp4"
-            ftp_url = upload_to_ftp(video_data, ftp_filename, 'binary')
-
-            # 최종 메타데이터 계산
-            final_duration = audio_duration if audio_url and 'audio_duration' in locals() else calculated_video_duration
-            scene_duration = final_duration / len(images) if len(images) > 0 else duration
-
-            return jsonify({
-                "success": True,
-                "video_url": video_url,
-                "ftp_url": ftp_url,  # FTP 저장 경로 추가
-                "metadata": {
-                    "duration": final_duration,
-                    "calculated_video_duration": calculated_video_duration,
-                    "audio_duration": audio_duration if audio_url and 'audio_duration' in locals() else None,
-                    "scene_duration": scene_duration,
-                    "fps": fps,
-                    "sync_audio": sync_audio,
-                    "images_count": len(images),
-                    "resolution": f"{width}x{height}",
-                    "resolution_type": resolution,
-                    "quality": quality,
-                    "file_size": len(video_data),
-                    "image_count": len(images),
-                    "has_audio": bool(audio_url),
-                    "audio_included": audio_url != "",
-                    "ftp_file": ftp_filename
-                },
-                "ffmpeg_log": result.stderr if audio_url else "Video generated without audio"
-            })
-
-        finally:
-            # 임시 파일 정리
-            import shutil
-            shutil.rmtree(temp_dir, ignore_errors=True)
-
-    except subprocess.CalledProcessError as e:
-        logger.error(f"FFmpeg execution failed: {e.stderr}")
+        # 같은 요청의 결과가 캐시에 있으면 렌더링 없이 완료된 작업으로 바로 반환 (모든 입력이 data: URL 인 경우만)
+        request_key = get_request_key(data)
+        if request_key is not None and render_cache.get(request_key) is not None:
+            job = video_job_store.create(data)
+            job_dir = video_job_store.get_dir(job['id'])
+            cached_data = render_cache.fetch(request_key, os.path.join(job_dir, OUTPUT_FILENAME))
+            if cached_data is not None:
+                job = video_job_store.update(job['id'], state=DONE, progress=100, message='완료 (캐시)',
+                                             result=dict(cached_data, cached=True))
+                logger.info(f"Render cache hit for job {job['id']}")
+                return jsonify(get_video_job_response(job))
+            # 그 사이 캐시에서 삭제됨. 빈 작업을 지우고 새로 렌더링
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+        job = video_job_queue.submit(data)
+        status_url = f"/api/video/jobs/{job['id']}"
         return jsonify({
-            "success": False,
-            "error": "FFmpeg 실행 실패",
-            "details": e.stderr
-        }), 500
+            "success": True,
+            "job_id": job['id'],
+            "state": job['state'],
+            "status_url": status_url
+        }), 202, {'Location': status_url}
+
+    except VideoRenderError as e:
+        return jsonify({"success": False, "error": str(e)}), e.status
+    except QueueFullError as e:
+        return jsonify({"success": False, "error": str(e)}), 503, {'Retry-After': '30'}
     except Exception as e:
         logger.error(f"Video generation error: {str(e)}")
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/api/video/jobs/<job_id>', methods=['GET'])
+def get_video_job(job_id):
+    """비디오 작업 상태와 진행률 조회"""
+    job = video_job_store.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    return jsonify(get_video_job_response(job))
+
+@app.route('/api/video/jobs/<job_id>/result', methods=['GET'])
+def get_video_job_result(job_id):
+    """완료된 작업의 비디오 파일을 디스크에서 바로 전송 (Range 요청 지원)"""
+    job = video_job_store.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    if job['state'] != DONE:
+        return jsonify({"success": False, "state": job['state'], "error": "Video is not ready"}), 409
+    output_path = os.path.join(video_job_store.get_dir(job_id), OUTPUT_FILENAME)
+    if not os.path.exists(output_path):
+        return jsonify({"success": False, "error": "Video file not found"}), 404
+    download_name = (job.get('result') or {}).get('metadata', {}).get('ftp_file') or f"video_{job_id}.mp4"
+    return send_file(
+        os.path.abspath(output_path),
+        mimetype='video/mp4',
+        as_attachment=request.args.get('download') == '1',
+        download_name=download_name,
+        conditional=True,
+        max_age=3600
+    )
+
 @app.route('/api/video/info', methods=['GET'])
 def ffmpeg_info():
     """FFmpeg 설치 정보 확인"""
@@ -830,6 +680,22 @@ def generate_tts():
         if not text:
             return jsonify({"success": False, "error": "Text is required"}), 400
 
+        provider = "Google Cloud TTS" if os.environ.get('GOOGLE_TTS_API_KEY') else "Edge TTS"
+        # 같은 텍스트/목소리/제공자의 음성은 캐시된 파일을 사용
+        cache_key = make_key('tts', text, voice, provider)
+        cached = render_cache.get(cache_key)
+        if cached is not None:
+            cached_path, cached_data = cached
+            try:
+                with open(cached_path, 'rb') as f:
+                    audio_base64 = base64.b64encode(f.read()).decode('utf-8')
+            except OSError as e:
+                # 조회한 뒤 캐시에서 삭제된 경우 캐시 미스로 처리
+                logger.info(f"TTS cache entry vanished: {e}")
+            else:
+                logger.info(f"TTS cache hit: {cache_key}")
+                return jsonify({"success": True, "audio_url": f"data:audio/mp3;base64,{audio_base64}", **cached_data, "cached": True})
+
         temp_dir = tempfile.mkdtemp()
         audio_path = os.path.join(temp_dir, 'tts_audio.mp3')
 
@@ -908,9 +774,7 @@ def generate_tts():
             ftp_filename = f"tts_{timestamp}_{safe_text}.mp3"
             ftp_url = upload_to_ftp(audio_data, ftp_filename, 'binary')
 
-            return jsonify({
-                "success": True,
-                "audio_url": audio_url,
+            result = {
                 "ftp_url": ftp_url,  # FTP 저장 경로 추가
                 "metadata": {
                     "text": text,
@@ -918,9 +782,12 @@ def generate_tts():
                     "duration": len(audio_data),
                     "format": "mp3",
                     "ftp_file": ftp_filename,
-                    "provider": "Google Cloud TTS" if os.environ.get('GOOGLE_TTS_API_KEY') else "Edge TTS"
+                    "provider": provider
                 }
-            })
+            }
+            render_cache.put(cache_key, audio_path, result)
+
+            return jsonify({"success": True, "audio_url": audio_url, **result})
 
         finally:
             # 임시 파일 정리
@@ -0,0 +1,130 @@
+import os
+import sys
+import json
+import shutil
+import logging
+import chromedriver_autoinstaller
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from typing import Optional
+
+
+'''
+크롬 버전, chromedriver 경로, User-Agent 를 한 번만 조사해서 browser_profile.json 에 저장합니다.
+setChromium() 에서 매번 임시 브라우저(fake_driver)를 띄워 User-Agent 를 읽던 작업을 대체하며,
+크롬 실행 파일이 바뀌었을 때(업데이트 등)만 다시 조사합니다.
+'''
+PROFILE_FILE = 'browser_profile.json'
+
+# 플랫폼별 크롬 실행 파일 기본 설치 위치
+CHROME_BINARY_CANDIDATES = {
+    'win32': [
+        os.path.join(os.environ.get('PROGRAMFILES', 'C:\\Program Files'), 'Google\\Chrome\\Application\\chrome.exe'),
+        os.path.join(os.environ.get('PROGRAMFILES(X86)', 'C:\\Program Files (x86)'), 'Google\\Chrome\\Application\\chrome.exe'),
+        os.path.join(os.environ.get('LOCALAPPDATA', ''), 'Google\\Chrome\\Application\\chrome.exe'),
+    ],
+    'darwin': [
+        '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+    ],
+    'linux': [
+        '/usr/bin/google-chrome',
+        '/usr/bin/google-chrome-stable',
+        '/usr/bin/chromium',
+        '/usr/bin/chromium-browser',
+    ],
+}
+
+_profile = None
+
+
+def get_driver_dir() -> str:
+    return os.getcwd().replace('\\', '/') + '/driver'
+
+
+def get_driver_path(chrome_ver: str) -> str:
+    filename = 'chromedriver.exe' if sys.platform == 'win32' else 'chromedriver'
+    return f'{get_driver_dir()}/{chrome_ver}/{filename}'
+
+
+def find_chrome_binary() -> Optional[str]:
+    """설치된 크롬 실행 파일 경로를 찾습니다. 찾지 못하면 None."""
+    platform = 'linux' if sys.platform.startswith('linux') else sys.platform
+    for path in CHROME_BINARY_CANDIDATES.get(platform, []):
+        if path and os.path.isfile(path):
+            return path
+    for name in ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser'):
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def get_binary_signature(path: Optional[str]) -> Optional[dict]:
+    """크롬 실행 파일의 경로/수정시간/크기. 크롬이 업데이트되면 값이 바뀝니다."""
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return {'path': path, 'mtime': stat.st_mtime, 'size': stat.st_size}
+
+
+def load_profile() -> Optional[dict]:
+    if not os.path.exists(PROFILE_FILE):
+        return None
+    try:
+        with open(PROFILE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logging.warning(f"{PROFILE_FILE} 파일을 읽지 못했습니다: {e}")
+        return None
+
+
+def save_profile(profile: dict) -> None:
+    try:
+        with open(PROFILE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(profile, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        logging.warning(f"{PROFILE_FILE} 파일을 저장하지 못했습니다: {e}")
+
+
+def probe_browser_profile() -> dict:
+    """임시 브라우저를 띄워 크롬 버전, chromedriver 경로, User-Agent 를 조사합니다."""
+    chrome_ver = chromedriver_autoinstaller.get_chrome_version().split('.')[0]
+    driver_path = get_driver_path(chrome_ver)
+    try:
+        fake_driver = webdriver.Chrome(service=Service(driver_path), options=webdriver.ChromeOptions())
+    except Exception:
+        chromedriver_autoinstaller.install(False, get_driver_dir())
+        fake_driver = webdriver.Chrome(service=Service(driver_path), options=webdriver.ChromeOptions())
+    try:
+        user_agent = fake_driver.execute_script("return navigator.userAgent;")
+    finally:
+        fake_driver.quit()
+    return {
+        'chrome_major': chrome_ver,
+        'driver_path': driver_path,
+        'user_agent': user_agent,
+    }
+
+
+def get_browser_profile(force: bool = False) -> dict:
+    """
+    저장된 브라우저 정보를 반환합니다. 크롬 실행 파일이 바뀌었거나 chromedriver 가 없으면 다시 조사합니다.
+    크롬 실행 파일 위치를 찾지 못하는 환경에서는 매번 조사합니다.
+    """
+    global _profile
+    signature = get_binary_signature(find_chrome_binary())
+    if not force and signature is not None:
+        cached = _profile or load_profile()
+        if cached and cached.get('chrome_binary') == signature and os.path.exists(cached.get('driver_path', '')):
+            _profile = cached
+            return cached
+
+    profile = probe_browser_profile()
+    profile['chrome_binary'] = signature
+    if signature is not None:
+        save_profile(profile)
+    _profile = profile
+    return profile
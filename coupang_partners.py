@@ -0,0 +1,130 @@
+import os
+import pickle
+import requests
+import rate_limiter
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from selenium import webdriver
+from typing import Optional
+
+
+'''
+쿠팡 파트너스 API 클라이언트.
+브라우저는 로그인에만 사용하고, 로그인된 브라우저의 쿠키와 AFATK(X-Token)를 한 번 가져와
+상품 검색(/api/v1/search)과 링크 생성(/api/v1/banner/iframe/url)을 requests.Session 으로 직접 호출합니다.
+'''
+PARTNERS_URL = 'https://partners.coupang.com'
+X_TOKEN_FILE = 'cookies_x_token.pkl'
+REQUEST_TIMEOUT = 15
+MAX_CONNECTIONS = 10 # 링크 동시 생성 수(COUPANG_LINK_CONCURRENCY)의 상한
+
+
+class CoupangPartnersClient:
+    """
+    Calls the Coupang Partners web API over a pooled requests.Session
+    using the cookies of a browser that is already logged in.
+    """
+    def __init__(self, cookies: list, x_token: Optional[str], user_agent: str, sub_id: Optional[str] = None):
+        self.x_token = x_token
+        self.sub_id = sub_id
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=MAX_CONNECTIONS)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': user_agent,
+            'Accept': 'application/json',
+            'Content-Type': 'application/json;charset=UTF-8',
+            'Origin': PARTNERS_URL,
+            'Referer': PARTNERS_URL + '/',
+        })
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie['name'], cookie['value'],
+                domain=cookie.get('domain'), path=cookie.get('path', '/')
+            )
+
+    @staticmethod
+    def get_browser_cookies(driver: webdriver.Chrome) -> list:
+        """현재 페이지와 상관없이 브라우저의 모든 쿠키를 가져옵니다."""
+        try:
+            return driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+        except Exception:
+            return driver.get_cookies()
+
+    @classmethod
+    def from_driver(cls, driver: webdriver.Chrome, sub_id: Optional[str] = None, keep_login: bool = False) -> 'CoupangPartnersClient':
+        """로그인된 브라우저에서 쿠키, X-Token, User-Agent 를 가져와 클라이언트를 만듭니다."""
+        cookies = cls.get_browser_cookies(driver)
+        x_token = next((cookie['value'] for cookie in cookies if cookie['name'] == 'AFATK'), None)
+        if x_token:
+            with open(X_TOKEN_FILE, 'wb') as f:
+                pickle.dump(x_token, f)
+        elif keep_login and os.path.exists(X_TOKEN_FILE):
+            with open(X_TOKEN_FILE, 'rb') as f:
+                x_token = pickle.load(f)
+            cookie = {'name': 'AFATK', 'value': x_token, 'domain': '.coupang.com', 'path': '/'}
+            cookies.append(cookie)
+            print('xtoken 쿠키 생성 완료')
+        else:
+            print('xtoken 없음')
+        user_agent = driver.execute_script("return navigator.userAgent;")
+        return cls(cookies, x_token, user_agent, sub_id)
+
+    def _post(self, path: str, body: dict, headers: Optional[dict] = None) -> dict:
+        """호스트별 속도 제한을 지키며 요청하고, 응답 상태를 속도 제한기에 알립니다."""
+        rate_limiter.wait(PARTNERS_URL)
+        response = self.session.post(PARTNERS_URL + path, json=body, headers=headers, timeout=REQUEST_TIMEOUT)
+        rate_limiter.report(PARTNERS_URL, response.status_code, rate_limiter.get_retry_after(response.headers))
+        response.raise_for_status()
+        return response.json()
+
+    def search(self, keyword: str, rocket: bool = False, page_size: int = 72) -> dict:
+        """키워드로 쿠팡 파트너스 상품을 검색합니다."""
+        body = {
+            "page": {"pageNumber": 0, "size": page_size},
+            "filter": keyword,
+            "deliveryTypes": ["ROCKET"] if rocket else [],
+        }
+        return self._post('/api/v1/search', body)
+
+    def create_link(self, product: dict) -> dict:
+        """검색 결과 상품 하나의 파트너스 단축 링크를 생성합니다."""
+        body = {
+            "product": {
+                "type": "PRODUCT",
+                "itemId": product['itemId'],
+                "productId": product['productId'],
+                "vendorItemId": product['vendorItemId'],
+                "image": product['image'],
+                "title": product['title'],
+                "originPrice": product['originPrice'],
+                "salesPrice": product['salesPrice'],
+            }
+        }
+        headers = {}
+        if self.x_token:
+            headers['X-Token'] = self.x_token
+        if self.sub_id:
+            headers['X-Sub-Id'] = self.sub_id
+        return self._post('/api/v1/banner/iframe/url', body, headers)
+
+    def create_links(self, products: list, max_workers: int = 4) -> list:
+        """
+        여러 상품의 링크를 동시에 생성합니다. 결과는 products 순서대로
+        (링크 생성 결과, 에러) 튜플이며, 실패한 상품은 (None, 에러) 입니다.
+        """
+        def create(product):
+            try:
+                return self.create_link(product), None
+            except Exception as e:
+                print(f"링크 생성 실패: {product.get('title')} ({e})")
+                return None, e
+
+        if not products:
+            return []
+        workers = max(1, min(int(max_workers), len(products), MAX_CONNECTIONS))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(create, products))
+
+    def close(self) -> None:
+        self.session.close()
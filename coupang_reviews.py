@@ -0,0 +1,93 @@
+import logging
+import rate_limiter
+from selenium import webdriver
+from typing import Optional
+
+
+'''
+쿠팡 상품 리뷰 수집.
+상품마다 execute_script 로 리뷰를 한 건씩 요청하고 random 한 시간만큼 쉬던 방식 대신,
+브라우저 안에서 동시 요청 수를 제한한 Promise 풀로 모든 상품의 리뷰를 한 번에 가져옵니다.
+요청은 www.coupang.com 페이지가 열려 있는 브라우저에서 실행해야 쿠키가 함께 전송됩니다.
+'''
+REVIEW_HOST = 'www.coupang.com'
+REVIEW_LIMIT = 3 # 포스팅에 사용할 리뷰 개수
+
+FETCH_REVIEWS_SCRIPT = """
+const items = arguments[0];
+const concurrency = Math.max(1, arguments[1]);
+const delayMs = arguments[2];
+const done = arguments[arguments.length - 1];
+const results = new Array(items.length).fill(null);
+const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+let next = 0;
+
+async function worker() {
+    while (next < items.length) {
+        const index = next++;
+        const [productId, vendorItemId] = items[index];
+        const url = 'https://www.coupang.com/vm/products/' + encodeURIComponent(productId)
+            + '/brand-sdp/reviews/list?vendorItemId=' + encodeURIComponent(vendorItemId);
+        try {
+            const response = await fetch(url, {method: 'GET', credentials: 'include'});
+            if (response.ok) {
+                results[index] = {status: response.status, data: await response.json()};
+            } else {
+                results[index] = {status: response.status, error: 'HTTP ' + response.status};
+            }
+        } catch (e) {
+            results[index] = {status: 0, error: String(e)};
+        }
+        if (delayMs > 0) {
+            await sleep(delayMs);
+        }
+    }
+}
+
+Promise.all(Array.from({length: Math.min(concurrency, items.length)}, worker))
+    .then(() => done(results));
+"""
+
+
+def fetch_reviews(driver: webdriver.Chrome, items: list, concurrency: int = 3, delay: float = 0.5) -> list:
+    '''
+    items 는 (productId, vendorItemId) 목록. 결과는 items 순서대로 {'status', 'data'} 또는 {'status', 'error'}.
+    concurrency 는 동시에 요청하는 상품 수, delay 는 한 요청이 끝난 뒤 다음 요청까지 쉬는 시간(초)입니다.
+    '''
+    if not items:
+        return []
+    items = [[str(product_id), str(vendor_item_id)] for product_id, vendor_item_id in items]
+    concurrency = max(1, int(concurrency))
+    # 제한 응답으로 허용 속도가 줄었다면 워커별 요청 간격도 늘림
+    delay *= rate_limiter.get_slowdown(REVIEW_HOST)
+    # 가장 느린 경우(모든 요청이 직렬로 처리)에도 충분한 스크립트 타임아웃. 끝나면 원래 값으로 되돌림
+    previous_timeout = driver.timeouts.script
+    driver.set_script_timeout(30 + len(items) * (10 + delay))
+    try:
+        rate_limiter.wait(REVIEW_HOST)
+        results = driver.execute_async_script(FETCH_REVIEWS_SCRIPT, items, concurrency, int(delay * 1000))
+    finally:
+        driver.set_script_timeout(previous_timeout)
+    for (product_id, vendor_item_id), result in zip(items, results):
+        rate_limiter.report(REVIEW_HOST, result.get('status') or None)
+        if result.get('error'):
+            logging.warning(f"리뷰 요청 실패 (productId={product_id}, vendorItemId={vendor_item_id}): {result['error']}")
+    return results
+
+
+def parse_review(result: Optional[dict]) -> dict:
+    '''
+    리뷰 응답에서 리뷰 수, 평점, 내용이 있는 상위 리뷰를 꺼냅니다. 요청이 실패한 상품은 빈 값.
+    '''
+    review = (result or {}).get('data') or {}
+    review_arr = []
+    for rv in review.get('reviews') or []:
+        if rv.get('content'):
+            review_arr.append(rv['content'])
+            if len(review_arr) == REVIEW_LIMIT:
+                break
+    return {
+        'count': review.get('ratingCount', 0),
+        'rating': review.get('ratingAverage', 0),
+        'review_article': ' '.join(review_arr),
+    }
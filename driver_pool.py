@@ -0,0 +1,136 @@
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+
+'''
+다중 키워드 작업용 크롬 드라이버 풀.
+키워드마다 setChromium()으로 브라우저를 새로 띄우고 쿠팡에 다시 로그인하는 대신,
+미리 띄워 로그인까지 끝낸 브라우저를 키워드 작업마다 빌려주고 돌려받습니다.
+'''
+class DriverPool:
+    """
+    Keeps up to `size` warm Chrome drivers and leases them to keyword jobs.
+
+    factory 는 새 드라이버를 만드는 함수(setChromium), warmup 은 새 드라이버가 만들어질 때
+    한 번만 실행되는 준비 작업(쿠팡 로그인 등)입니다. 작업 중 예외가 발생했거나
+    창이 닫힌 드라이버, max_uses 회 이상 사용한 드라이버는 종료 후 새로 만듭니다.
+    """
+    def __init__(self, factory: Callable[[], webdriver.Chrome], size: int = 1,
+                 warmup: Optional[Callable[[webdriver.Chrome], None]] = None, max_uses: int = 20):
+        self._factory = factory
+        self._warmup = warmup
+        self._size = max(1, int(size))
+        self._max_uses = max_uses
+        self._idle = queue.LifoQueue()
+        self._uses = {}
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+    def _create(self) -> webdriver.Chrome:
+        driver = self._factory()
+        if self._warmup is not None:
+            try:
+                self._warmup(driver)
+            except Exception:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+                raise
+        self._uses[id(driver)] = 0
+        logging.info(f"드라이버 풀: 새 브라우저 생성 ({self._created}/{self._size})")
+        return driver
+
+    def _quit(self, driver: webdriver.Chrome) -> None:
+        self._uses.pop(id(driver), None)
+        with self._lock:
+            self._created -= 1
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.warning(f"드라이버 풀: 브라우저 종료 중 오류 {e}")
+
+    def is_healthy(self, driver: webdriver.Chrome) -> bool:
+        """브라우저 창이 살아있고 WebDriver 세션이 응답하는지 확인합니다."""
+        try:
+            return len(driver.window_handles) > 0
+        except WebDriverException:
+            return False
+
+    def start(self) -> None:
+        """풀 크기만큼 브라우저를 미리 띄워둡니다."""
+        while True:
+            with self._lock:
+                if self._created >= self._size:
+                    return
+                self._created += 1
+            try:
+                self._idle.put(self._create())
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+    def acquire(self, timeout: Optional[float] = None) -> webdriver.Chrome:
+        if self._closed:
+            raise RuntimeError("드라이버 풀이 이미 종료되었습니다.")
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = None
+                with self._lock:
+                    can_create = self._created < self._size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    try:
+                        return self._create()
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                try:
+                    driver = self._idle.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError("사용 가능한 브라우저가 없습니다.")
+            if self.is_healthy(driver):
+                return driver
+            logging.warning("드라이버 풀: 응답하지 않는 브라우저를 교체합니다.")
+            self._quit(driver)
+
+    def release(self, driver: webdriver.Chrome, broken: bool = False) -> None:
+        uses = self._uses.get(id(driver), 0) + 1
+        if self._closed or broken or uses >= self._max_uses or not self.is_healthy(driver):
+            self._quit(driver)
+            return
+        self._uses[id(driver)] = uses
+        self._idle.put(driver)
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        """with pool.lease() as driver: 형태로 사용. 예외 발생 시 브라우저를 교체합니다."""
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        except BaseException:
+            self.release(driver, broken=True)
+            raise
+        else:
+            self.release(driver)
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(driver)
@@ -0,0 +1,153 @@
+import os
+import json
+import time
+import heapq
+import logging
+import datetime
+import threading
+from typing import Optional
+
+
+'''
+색인 요청 기록 (append-only JSONL).
+index.json 의 URL 을 매번 모두 다시 요청하면 하루 200개 할당량과 시간을 이미 등록된 URL 에 낭비하므로,
+URL 별 마지막 요청 시각/상태/수정일(lastmod)을 파일에 한 줄씩 이어 쓰고 메모리에서는 URL 로 색인합니다.
+
+요청 대상은 우선순위 큐로 고릅니다:
+    0 - 처음 보는 URL
+    1 - lastmod 가 바뀐 URL
+    2 - 이전 요청이 실패한 URL (오래된 것부터)
+하루 할당량을 넘는 URL 은 다음 실행(다음 날)으로 넘어갑니다.
+
+index.json 의 urls 항목은 문자열 또는 {"url": ..., "lastmod": ...} 형식을 모두 사용할 수 있습니다.
+'''
+LEDGER_FILE = 'indexing_ledger.jsonl'
+DAILY_QUOTA = 200  # Indexing API 기본 하루 요청 한도
+
+PRIORITY_NEW = 0
+PRIORITY_CHANGED = 1
+PRIORITY_RETRY = 2
+
+
+def normalize_entry(entry) -> tuple:
+    """index.json 의 항목을 (url, lastmod) 로 변환합니다."""
+    if isinstance(entry, dict):
+        return entry.get('url'), entry.get('lastmod')
+    return entry, None
+
+
+class IndexingLedger:
+    """
+    Append-only JSONL log of indexing submissions with an in-memory index of the latest
+    record per URL. Picks which URLs to submit under the daily quota.
+    """
+    def __init__(self, path: str = LEDGER_FILE, daily_quota: int = DAILY_QUOTA):
+        self.path = path
+        self.daily_quota = daily_quota
+        self._index = {}  # url -> 마지막 기록
+        self._submitted_today = 0
+        self._today = self._get_today()
+        self._lines = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def _get_today() -> str:
+        return datetime.date.today().isoformat()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 중간에 끊긴 마지막 줄 등은 무시
+                    continue
+                self._lines += 1
+                self._index[record['url']] = record
+                if record.get('date') == self._today:
+                    self._submitted_today += 1
+        logging.info(f"색인 요청 기록 {len(self._index)}개를 읽었습니다. (오늘 요청 {self._submitted_today}개)")
+        # 같은 URL 의 오래된 기록이 많이 쌓이면 마지막 기록만 남기고 다시 씀
+        if self._lines > 2 * len(self._index) + 100:
+            self.compact()
+
+    def _roll_day(self) -> None:
+        today = self._get_today()
+        if today != self._today:
+            self._today = today
+            self._submitted_today = 0
+
+    def get(self, url: str) -> Optional[dict]:
+        return self._index.get(url)
+
+    def remaining_quota(self) -> int:
+        with self._lock:
+            self._roll_day()
+            return max(0, self.daily_quota - self._submitted_today)
+
+    def get_priority(self, url: str, lastmod: Optional[str]) -> Optional[int]:
+        """요청 우선순위. 이미 등록되었고 바뀌지 않은 URL 은 None."""
+        record = self._index.get(url)
+        if record is None:
+            return PRIORITY_NEW
+        if lastmod and lastmod != record.get('lastmod'):
+            return PRIORITY_CHANGED
+        if record.get('status') != 200:
+            return PRIORITY_RETRY
+        return None
+
+    def select(self, entries: list) -> list:
+        """
+        index.json 의 항목 중 오늘 요청할 URL 목록을 우선순위 순서로 반환합니다.
+        반환값은 [(url, lastmod), ...] 이며 남은 하루 할당량을 넘지 않습니다.
+        """
+        heap = []
+        seen = set()
+        for order, entry in enumerate(entries):
+            url, lastmod = normalize_entry(entry)
+            if not url or url in seen:
+                continue
+            seen.add(url)
+            priority = self.get_priority(url, lastmod)
+            if priority is None:
+                continue
+            # 같은 우선순위에서는 오래전에 요청한 URL, 파일에 먼저 나온 URL 부터
+            submitted_at = (self._index.get(url) or {}).get('submitted_at', 0)
+            heapq.heappush(heap, (priority, submitted_at, order, url, lastmod))
+        quota = self.remaining_quota()
+        selected = [(url, lastmod) for _, _, _, url, lastmod in heapq.nsmallest(quota, heap)]
+        skipped = len(seen) - len(heap)
+        deferred = len(heap) - len(selected)
+        logging.info(f"요청 대상 {len(selected)}개, 이미 등록됨 {skipped}개, 할당량 초과로 다음으로 미룸 {deferred}개")
+        return selected
+
+    def record(self, url: str, status: Optional[int], lastmod: Optional[str] = None) -> None:
+        """요청 결과를 기록 파일에 한 줄 추가합니다."""
+        with self._lock:
+            self._roll_day()
+            previous = self._index.get(url) or {}
+            record = {
+                'url': url,
+                'status': status,
+                'lastmod': lastmod or previous.get('lastmod'),
+                'submitted_at': time.time(),
+                'date': self._today,
+            }
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._index[url] = record
+            self._submitted_today += 1
+            self._lines += 1
+
+    def compact(self) -> None:
+        """URL 별 마지막 기록만 남기고 파일을 다시 씁니다."""
+        with self._lock:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for record in self._index.values():
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            os.replace(tmp_path, self.path)
+            self._lines = len(self._index)
@@ -0,0 +1,138 @@
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+'''
+네이버 키워드 지표 캐시 (SQLite).
+키워드 도구(api.naver.com/keywordstool)의 월간 검색수와 검색 API(openapi.naver.com webkr)의 문서수는
+자주 바뀌지 않으므로 키워드별로 저장해 두고, 유효기간(TTL) 안에서는 네트워크 요청 없이 재사용합니다.
+검색수와 문서수는 서로 다른 유효기간을 가집니다.
+최근 분석 결과(DataFrame)는 KeywordResultCache 에 메모리 크기 제한을 두고 보관합니다.
+'''
+CACHE_FILE = 'keyword_cache.db'
+DEFAULT_VOLUME_TTL = 7 * 24 * 3600  # 월간 검색수: 7일
+DEFAULT_DOCS_TTL = 24 * 3600  # 문서수: 1일
+
+
+class KeywordCache:
+    """
+    Thread-safe SQLite cache for keyword volume lists and document totals,
+    with a separate TTL per kind and hit/miss counters.
+    """
+    def __init__(self, path: str = CACHE_FILE, volume_ttl: float = DEFAULT_VOLUME_TTL, docs_ttl: float = DEFAULT_DOCS_TTL):
+        self.path = path
+        self.volume_ttl = volume_ttl
+        self.docs_ttl = docs_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS volume (keyword TEXT PRIMARY KEY, data TEXT NOT NULL, fetched_at REAL NOT NULL)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS docs (keyword TEXT PRIMARY KEY, total INTEGER NOT NULL, fetched_at REAL NOT NULL)')
+        self._conn.commit()
+        self._stats = {'volume': [0, 0], 'docs': [0, 0]}  # [hit, miss]
+
+    def _count(self, kind: str, hit: bool) -> None:
+        self._stats[kind][0 if hit else 1] += 1
+
+    def get_volume(self, keyword: str) -> Optional[list]:
+        """검색어의 키워드 도구 결과(keywordList). 없거나 만료되었으면 None."""
+        with self._lock:
+            row = self._conn.execute('SELECT data, fetched_at FROM volume WHERE keyword = ?', (keyword,)).fetchone()
+            hit = row is not None and time.time() - row[1] < self.volume_ttl
+            self._count('volume', hit)
+        return json.loads(row[0]) if hit else None
+
+    def set_volume(self, keyword: str, keyword_list: list) -> None:
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO volume VALUES (?, ?, ?)', (keyword, json.dumps(keyword_list, ensure_ascii=False), time.time()))
+            self._conn.commit()
+
+    def get_docs(self, keyword: str) -> Optional[int]:
+        """키워드의 웹문서 총 개수. 없거나 만료되었으면 None."""
+        with self._lock:
+            row = self._conn.execute('SELECT total, fetched_at FROM docs WHERE keyword = ?', (keyword,)).fetchone()
+            hit = row is not None and time.time() - row[1] < self.docs_ttl
+            self._count('docs', hit)
+        return row[0] if hit else None
+
+    def set_docs(self, keyword: str, total: int) -> None:
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO docs VALUES (?, ?, ?)', (keyword, int(total), time.time()))
+            self._conn.commit()
+
+    def purge_expired(self) -> None:
+        """유효기간이 지난 항목을 삭제합니다."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute('DELETE FROM volume WHERE fetched_at < ?', (now - self.volume_ttl,))
+            self._conn.execute('DELETE FROM docs WHERE fetched_at < ?', (now - self.docs_ttl,))
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """종류별 적중/실패 횟수와 적중률."""
+        result = {}
+        for kind, (hit, miss) in self._stats.items():
+            total = hit + miss
+            result[kind] = {'hit': hit, 'miss': miss, 'hit_rate': round(hit / total, 3) if total else 0.0}
+        return result
+
+    def print_stats(self) -> None:
+        for kind, stat in self.stats().items():
+            print(f"키워드 캐시 [{kind}] 적중 {stat['hit']} / 실패 {stat['miss']} (적중률 {stat['hit_rate'] * 100:.1f}%)")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class KeywordResultCache:
+    """
+    In-memory LRU of recent analysis results (DataFrame per seed keyword),
+    bounded by the total DataFrame memory size instead of the number of entries.
+    """
+    def __init__(self, max_bytes: int, ttl: float = DEFAULT_DOCS_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._items = OrderedDict()  # keyword -> (DataFrame, 크기, 저장 시각)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, keyword: str):
+        """최근 분석 결과의 복사본. 없거나 유효기간이 지났으면 None."""
+        with self._lock:
+            item = self._items.get(keyword)
+            if item is None:
+                return None
+            if time.time() - item[2] >= self.ttl:
+                self._remove(keyword)
+                return None
+            self._items.move_to_end(keyword)
+            return item[0].copy()
+
+    def put(self, keyword: str, df) -> None:
+        size = int(df.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if keyword in self._items:
+                self._remove(keyword)
+            self._items[keyword] = (df.copy(), size, time.time())
+            self._size += size
+            # 용량을 넘으면 가장 오래 사용하지 않은 결과부터 제거
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._items)))
+
+    def _remove(self, keyword: str) -> None:
+        _, size, _ = self._items.pop(keyword)
+        self._size -= size
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def size(self) -> int:
+        return self._size
@@ -0,0 +1,102 @@
+import os
+from typing import Optional
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # parquet 출력은 pyarrow 가 설치된 경우에만 사용
+    pa = None
+    pq = None
+
+
+'''
+키워드 분석 결과 내보내기.
+검색어마다 엑셀 파일 전체를 다시 쓰던 방식 대신, 분석이 끝난 검색어의 결과를 바로 파일에 이어서 쓰고
+모든 검색어가 끝나면 한 번만 닫습니다. csv/parquet 는 결과를 메모리에 모아두지 않으므로 검색어가 많아도 메모리 사용량이 일정합니다.
+
+지원 형식 (.env KEYWORD_EXPORT_FORMATS, 쉼표 구분):
+    xlsx    - 검색어별 시트 (기본값)
+    csv     - 한 파일에 '검색어' 열을 추가해 이어쓰기
+    parquet - 한 파일에 '검색어' 열을 추가해 이어쓰기 (pyarrow 필요)
+'''
+SUPPORTED_FORMATS = ('xlsx', 'csv', 'parquet')
+SHEET_NAME_LIMIT = 31  # 엑셀 시트 이름 최대 길이
+
+
+class KeywordExporter:
+    """
+    Streams each seed's result DataFrame to the configured outputs as soon as it is ready.
+    Use as a context manager so the files are closed once at the end of the run.
+    """
+    def __init__(self, base_path: str, formats: Optional[list] = None):
+        self.base_path = base_path
+        self.formats = [f for f in (formats or ['xlsx']) if f in SUPPORTED_FORMATS]
+        if 'parquet' in self.formats and pq is None:
+            print('pyarrow 가 설치되어 있지 않아 parquet 파일은 만들지 않습니다.')
+            self.formats.remove('parquet')
+        self.paths = []
+        self._excel = None
+        self._csv_path = None
+        self._parquet = None
+        self._sheet_names = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _get_sheet_name(self, keyword: str) -> str:
+        name = str(keyword)[:SHEET_NAME_LIMIT] or 'sheet'
+        n = 1
+        while name in self._sheet_names:
+            suffix = f'_{n}'
+            name = str(keyword)[:SHEET_NAME_LIMIT - len(suffix)] + suffix
+            n += 1
+        self._sheet_names.add(name)
+        return name
+
+    def _write_xlsx(self, keyword: str, df: pd.DataFrame) -> None:
+        if self._excel is None:
+            path = self.base_path + '.xlsx'
+            # constant_memory 모드는 행 순서대로만 쓸 수 있는데 to_excel 은 열 단위로 쓰므로 사용하지 않음
+            self._excel = pd.ExcelWriter(path, engine='xlsxwriter')
+            self.paths.append(path)
+        df.to_excel(self._excel, sheet_name=self._get_sheet_name(keyword), index=False)
+
+    def _write_csv(self, keyword: str, df: pd.DataFrame) -> None:
+        first = self._csv_path is None
+        if first:
+            self._csv_path = self.base_path + '.csv'
+            self.paths.append(self._csv_path)
+        # 엑셀에서 한글이 깨지지 않도록 utf-8-sig 로 저장
+        df.assign(검색어=keyword).to_csv(
+            self._csv_path, mode='w' if first else 'a', header=first, index=False,
+            encoding='utf-8-sig' if first else 'utf-8'
+        )
+
+    def _write_parquet(self, keyword: str, df: pd.DataFrame) -> None:
+        table = pa.Table.from_pandas(df.assign(검색어=keyword), preserve_index=False)
+        if self._parquet is None:
+            path = self.base_path + '.parquet'
+            self._parquet = pq.ParquetWriter(path, table.schema)
+            self.paths.append(path)
+        self._parquet.write_table(table.cast(self._parquet.schema))
+
+    def write(self, keyword: str, df: pd.DataFrame) -> None:
+        """검색어 하나의 분석 결과를 설정된 모든 형식으로 씁니다."""
+        os.makedirs(os.path.dirname(self.base_path) or '.', exist_ok=True)
+        for fmt in self.formats:
+            getattr(self, f'_write_{fmt}')(keyword, df)
+
+    def close(self) -> list:
+        """파일을 닫고 생성된 파일 경로 목록을 반환합니다."""
+        if self._excel is not None:
+            self._excel.close()
+            self._excel = None
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+        return self.paths
@@ -1,8 +1,6 @@
 import os
 import sys
 import time
-import urllib.request
-import json
 import pandas as pd
 import random
 import requests
@@ -10,8 +8,15 @@ import datetime
 import hashlib
 import hmac
 import base64
-from dotenv import get_key
+import threading
+import rate_limiter
+from settings import get_settings
+from keyword_cache import KeywordCache, KeywordResultCache
+from keyword_export import KeywordExporter
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
+from typing import Optional
 
 '''
 Naver 검색 API 연동을 위한 클래스와 함수
@@ -26,12 +31,13 @@ class Signature:
         return base64.b64encode(hash.digest())
 
 def get_request_header(method, uri):
+    config = get_settings()
     # 네이버 검색 광고 API Secrent key
-    SECRET_KEY = get_key('.env', 'NAVER_SEARCH_SECRET')
+    SECRET_KEY = config.get('.env', 'NAVER_SEARCH_SECRET')
     # 네이버 검색 광고 Customer ID
-    CUSTOMER_ID = get_key('.env', 'CUSTOMER_ID')
+    CUSTOMER_ID = config.get('.env', 'CUSTOMER_ID')
     # 네이버 검색 광고 API Key
-    API_KEY = get_key('.env', 'NAVER_SEARCH_KEY')
+    API_KEY = config.get('.env', 'NAVER_SEARCH_KEY')
     timestamp = str(round(time.time() * 1000))
     # 네이버 인증을 위한 Signatuer 생성 
     signature = Signature.generate(timestamp, method, uri, SECRET_KEY)
@@ -43,87 +49,160 @@ def get_request_header(method, uri):
         'X-Signature': signature
     }
 
+NAVER_AD_API_URL = 'https://api.naver.com'
+NAVER_WEBKR_URL = 'https://openapi.naver.com/v1/search/webkr.json'
+REQUEST_TIMEOUT = 10
+
+# 문서수 조회 초당 요청 수 (.env NAVER_SEARCH_QPS).
+# 인스턴스를 만들 때마다 설정하면 제한 응답으로 줄어든 속도가 초기화되므로 모듈을 불러올 때 한 번만 적용
+_search_qps = get_settings().get_float('.env', 'NAVER_SEARCH_QPS')
+if _search_qps:
+    rate_limiter.configure(NAVER_WEBKR_URL, _search_qps)
+
 class KeywordGenerator:
-    _list: list = []
+    # 최근 분석 결과. 모든 인스턴스가 공유하며 메모리 크기로 제한 (.env KEYWORD_RESULT_CACHE_MB)
+    _recent: Optional[KeywordResultCache] = None
+    _recent_lock = threading.Lock()
+
     def __init__(self):
-        pass
+        config = get_settings()
+        # 이번 실행의 분석 결과. 실행마다 새로 만들어 이전 실행 결과가 쌓이지 않음
+        self._list: list = []
+        with KeywordGenerator._recent_lock:
+            if KeywordGenerator._recent is None:
+                KeywordGenerator._recent = KeywordResultCache(
+                    max_bytes=int(config.get_float('.env', 'KEYWORD_RESULT_CACHE_MB', 64) * 1024 * 1024),
+                    ttl=config.get_float('.env', 'KEYWORD_DOCS_TTL_HOURS', 24) * 3600
+                )
+        # 연관 키워드 문서수 조회 동시 요청 수 (.env)
+        self.max_workers = max(1, config.get_int('.env', 'NAVER_SEARCH_CONCURRENCY', 8))
+        # 요청마다 연결을 새로 맺지 않도록 keep-alive 세션을 재사용
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.max_workers)
+        self.session.mount('https://', adapter)
+        # 검색수/문서수 캐시. 유효기간은 시간 단위 (.env KEYWORD_VOLUME_TTL_HOURS, KEYWORD_DOCS_TTL_HOURS)
+        self.cache = KeywordCache(
+            volume_ttl=config.get_float('.env', 'KEYWORD_VOLUME_TTL_HOURS', 168) * 3600,
+            docs_ttl=config.get_float('.env', 'KEYWORD_DOCS_TTL_HOURS', 24) * 3600
+        )
+        # 결과 파일 형식 (xlsx, csv, parquet)
+        self.export_formats = config.get_list('.env', 'KEYWORD_EXPORT_FORMATS') or ['xlsx']
+
+    # 네이버 검색 광고 키워드 도구 API 로 입력된 검색어의 연관 검색어를 조회
+    def getKeywordList(self, keyword: str) -> list:
+        cached = self.cache.get_volume(keyword)
+        if cached is not None:
+            return cached
+        uri = '/keywordstool'
+        method = 'GET'
+        rate_limiter.wait(NAVER_AD_API_URL)
+        r = self.session.get(
+            NAVER_AD_API_URL + uri,
+            params={'hintKeywords': keyword, 'showDetail': 1},
+            headers=get_request_header(method, uri),
+            timeout=REQUEST_TIMEOUT
+        )
+        rate_limiter.report(NAVER_AD_API_URL, r.status_code, rate_limiter.get_retry_after(r.headers))
+        keyword_list = r.json()['keywordList']
+        self.cache.set_volume(keyword, keyword_list)
+        return keyword_list
+
     # 키워드 조사
     def getKeywords(self, keywords:list[str])->pd.DataFrame:        
-        BASE_URL = 'https://api.naver.com'
         result = pd.DataFrame()
-        # 네이버 검색 광고 키워드 도구의 API 를 사용하여 입력된 검색어의 연관 검색어를 조회
-        for keyword in keywords:
-            uri = '/keywordstool'
-            method = 'GET'
-            r = requests.get(
-                BASE_URL + uri,
-                params={'hintKeywords': keyword, 'showDetail': 1},
-                headers=get_request_header(method, uri)
-            )
-
-            # keyword analysis process
-            try:
-                df = pd.DataFrame(r.json()['keywordList'])
-                df['monthlyMobileQcCnt'] = df['monthlyMobileQcCnt'].apply(lambda x: int(str(x).replace('<', '').strip()))
-                df['monthlyPcQcCnt'] = df['monthlyPcQcCnt'].apply(lambda x: int(str(x).replace('<', '').strip()))
-                df = df[(df['monthlyMobileQcCnt'] >= 50) & (df['monthlyPcQcCnt'] >= 50)]
-                df.rename(
-                    {'compIdx': '경쟁정도',
-                    'monthlyMobileQcCnt': '월간검색수_모바일',
-                    'monthlyPcQcCnt': '월간검색수_PC',
-                    'relKeyword': '연관키워드'},
-                    axis=1,
-                    inplace=True
-                )
-                df = df[['연관키워드', '월간검색수_PC', '월간검색수_모바일', '경쟁정도']]
-                df['총검색수'] = df['월간검색수_PC'] + df['월간검색수_모바일']
-                df = df.sort_values('총검색수', ascending=False)
-                # self.tmp_df = pd.concat([self.tmp_df, df], axis=0)
-                print(df)
-                if df.size > 0:
-                    # 네이버 검색 API를 활용하여 연관된 검색어를 좀 더 조사
-                    result = self.getRelatedKeywords(df)
-                    self._list.append({'keyword': keyword, 'df': result})
-                else:
+        self._list = []
+        # 최근에 분석한 검색어는 메모리의 결과를 그대로 사용
+        recent = {keyword: self._recent.get(keyword) for keyword in keywords}
+        pending = [keyword for keyword in keywords if recent[keyword] is None]
+        # 나머지 검색어들의 연관 검색어를 동시에 조회
+        with ThreadPoolExecutor(max_workers=min(len(pending), self.max_workers) or 1) as executor:
+            futures = {keyword: executor.submit(self.getKeywordList, keyword) for keyword in pending}
+        export_path = os.getcwd().replace('\\', '/')+'/keywords/'+f'{keywords}'
+        # 결과는 검색어마다 파일에 이어 쓰고, 모든 검색어가 끝나면 한 번만 닫음
+        with KeywordExporter(export_path, self.export_formats) as exporter:
+            for keyword in keywords:
+                if recent[keyword] is not None:
+                    print(f'최근 분석 결과 사용: {keyword}')
+                    self._list.append({'keyword': keyword, 'df': recent[keyword]})
+                    exporter.write(keyword, recent[keyword])
                     continue
-                time.sleep(1)
-            except Exception as e:
-                print(str(e))
-            # 입력된 키워드를 엑셀파일로 구성
-            for detail in self._list:
-                detail['df'].to_excel(os.getcwd().replace('\\', '/')+'/keywords/'+f'{keywords}.xlsx',sheet_name=detail['keyword'], index=False)
-            
+                # keyword analysis process
+                try:
+                    df = pd.DataFrame(futures[keyword].result())
+                    # '< 10' 처럼 문자열로 오는 검색수를 열 단위로 한 번에 숫자로 변환
+                    for column in ('monthlyMobileQcCnt', 'monthlyPcQcCnt'):
+                        df[column] = pd.to_numeric(
+                            df[column].astype(str).str.replace('<', '', regex=False).str.strip(),
+                            errors='coerce'
+                        ).fillna(0).astype(int)
+                    df = df.loc[
+                        (df['monthlyMobileQcCnt'] >= 50) & (df['monthlyPcQcCnt'] >= 50),
+                        ['relKeyword', 'monthlyPcQcCnt', 'monthlyMobileQcCnt', 'compIdx']
+                    ].rename(columns={
+                        'compIdx': '경쟁정도',
+                        'monthlyMobileQcCnt': '월간검색수_모바일',
+                        'monthlyPcQcCnt': '월간검색수_PC',
+                        'relKeyword': '연관키워드'
+                    })
+                    df['총검색수'] = df['월간검색수_PC'] + df['월간검색수_모바일']
+                    df = df.sort_values('총검색수', ascending=False)
+                    print(df)
+                    if df.size > 0:
+                        # 네이버 검색 API를 활용하여 연관된 검색어를 좀 더 조사
+                        result = self.getRelatedKeywords(df)
+                        self._list.append({'keyword': keyword, 'df': result})
+                        self._recent.put(keyword, result)
+                        exporter.write(keyword, result)
+                except Exception as e:
+                    print(str(e))
+        print('키워드 분석 결과 파일: ' + ', '.join(exporter.paths))
+        self.cache.print_stats()
         return True
+
+    # 네이버 검색 API로 키워드 하나의 웹문서 총 개수를 조회. 실패하면 0
+    def getTotalDocs(self, word: str, client_id: str, client_secret: str) -> int:
+        cached = self.cache.get_docs(word)
+        if cached is not None:
+            return cached
+        rate_limiter.wait(NAVER_WEBKR_URL)
+        try:
+            response = self.session.get(
+                NAVER_WEBKR_URL,
+                params={'query': word},
+                headers={'X-Naver-Client-Id': client_id, 'X-Naver-Client-Secret': client_secret},
+                timeout=REQUEST_TIMEOUT
+            )
+        except requests.RequestException as e:
+            print(f"문서수 조회 실패 ({word}): {e}")
+            return 0
+        rate_limiter.report(NAVER_WEBKR_URL, response.status_code, rate_limiter.get_retry_after(response.headers))
+        if response.status_code != 200:
+            print("Error Code:" + str(response.status_code))
+            return 0
+        try:
+            total = response.json()['total']
+        except (ValueError, KeyError):
+            return 0
+        self.cache.set_docs(word, total)
+        return total
+
     # 네이버 검색 API로 연관 키워드를 더 조사하는 함수
     def getRelatedKeywords(self, df: pd.DataFrame)->pd.DataFrame:
-        total_docs = []
         if not df.empty:
+            config = get_settings()
             # 네이버 검색 API 클라이언트 ID
-            client_id = get_key('.env', 'NAVER_CLIENT_ID')
+            client_id = config.get('.env', 'NAVER_CLIENT_ID')
             # 네이버 검색 API 클라이언트 Secret 
-            client_secret = get_key('.env','NAVER_CLIENT_SECRET')
+            client_secret = config.get('.env','NAVER_CLIENT_SECRET')
             # '연관키워드' 개수 출력
             print("연관키워드 개수:", len(df['연관키워드']))
-            for word in tqdm(df['연관키워드']):
-                encText = urllib.parse.quote(word)
-                url = "https://openapi.naver.com/v1/search/webkr.json?query=" + encText
-                request = urllib.request.Request(url)
-                request.add_header("X-Naver-Client-Id", client_id)
-                request.add_header("X-Naver-Client-Secret", client_secret)
-                response = urllib.request.urlopen(request)
-                rescode = response.getcode()
-
-                try:
-                    if(rescode==200):
-                        response_body = response.read()
-                        text = response_body.decode('utf-8')
-
-                        total_docs.append(json.loads(text)['total'])
-                    else:
-                        print("Error Code:" + rescode)
-                except:
-                    total_docs.append(0)
-                time.sleep(1)
+            # 연관 키워드의 문서수를 동시에 조회. 초당 요청 수는 rate_limiter 가 제한
+            words = list(df['연관키워드'])
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                total_docs = list(tqdm(
+                    executor.map(lambda word: self.getTotalDocs(word, client_id, client_secret), words),
+                    total=len(words)
+                ))
 
             df['총문서수'] = total_docs
             df['경쟁정도_ratio'] = round(df['총문서수'] / df['총검색수'],2)
@@ -0,0 +1,112 @@
+import time
+import json
+import sqlite3
+import hashlib
+import threading
+from typing import Optional, Union
+
+
+'''
+GPT 응답 캐시 (SQLite).
+같은 상품/키워드로 다른 블로그에 글을 쓸 때 리뷰 요약, 구매 가이드, 소개 문구, 제목을 다시 요청하지 않도록
+모델, 프롬프트 버전, 입력값의 해시를 키로 응답을 저장합니다.
+전체 크기가 max_bytes 를 넘으면 가장 오래 사용하지 않은 응답부터 지우고, ttl 을 지정하면 그보다 오래된 응답은 사용하지 않습니다.
+캐시는 get_llm_cache() 로 파일마다 하나만 만들어 프로세스 전체에서 공유합니다.
+'''
+CACHE_FILE = 'llm_cache.db'
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+_lock = threading.Lock()
+_caches = {}
+
+
+def make_key(model: str, kind: str, version: Union[int, str], *inputs) -> str:
+    """모델, 호출 종류, 프롬프트 버전, 입력값으로 만든 캐시 키 (sha256)."""
+    payload = json.dumps([model, kind, str(version), [str(i) for i in inputs]], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """
+    Content-addressed, size-bounded LRU cache of LLM responses with an optional TTL.
+    Safe to share between threads.
+    """
+    def __init__(self, path: str = CACHE_FILE, max_bytes: int = DEFAULT_MAX_BYTES, ttl: Optional[float] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl or None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, kind TEXT NOT NULL, value TEXT NOT NULL, size INTEGER NOT NULL, '
+            'created_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)')
+        self._conn.commit()
+        self._size = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        self._stats = {}  # kind -> [hit, miss]
+
+    def _count(self, kind: str, hit: bool) -> None:
+        self._stats.setdefault(kind, [0, 0])[0 if hit else 1] += 1
+
+    def get(self, key: str, kind: str = '', ttl: Optional[float] = None) -> Optional[str]:
+        """저장된 응답. 없거나 유효기간(ttl, 지정하지 않으면 캐시의 ttl)이 지났으면 None."""
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT value, created_at, size FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is not None and ttl and now - row[1] >= ttl:
+                self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self._conn.commit()
+                self._size -= row[2]
+                row = None
+            if row is not None:
+                self._conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+                self._conn.commit()
+            self._count(kind, row is not None)
+        return row[0] if row is not None else None
+
+    def set(self, key: str, value: str, kind: str = '') -> None:
+        size = len(value.encode('utf-8'))
+        if not value or size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self._conn.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)', (key, kind, value, size, now, now))
+            self._size += size - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # 용량을 넘으면 가장 오래 사용하지 않은 응답부터 삭제
+        while self._size > self.max_bytes:
+            rows = self._conn.execute('SELECT key, size FROM responses ORDER BY accessed_at LIMIT 100').fetchall()
+            if not rows:
+                self._size = 0
+                return
+            for key, size in rows:
+                self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self._size -= size
+                if self._size <= self.max_bytes:
+                    return
+
+    def stats(self) -> dict:
+        """호출 종류별 적중/실패 횟수."""
+        return {kind: {'hit': hit, 'miss': miss} for kind, (hit, miss) in self._stats.items()}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def get_llm_cache(path: str = CACHE_FILE, max_bytes: int = DEFAULT_MAX_BYTES) -> LLMCache:
+    """파일 경로가 같으면 같은 캐시를 반환합니다. 연결과 전체 크기 계산을 프로세스 전체에서 공유합니다."""
+    with _lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = LLMCache(path, max_bytes)
+            _caches[path] = cache
+        return cache
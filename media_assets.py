@@ -0,0 +1,146 @@
+import os
+import base64
+import logging
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import List, Optional
+
+'''
+비디오 입력 이미지 다운로드.
+장면 이미지를 하나씩 순서대로 받지 않고 keep-alive 세션으로 동시에 받아 디스크에 나눠서 저장합니다.
+확장자는 Content-Type 대신 파일 앞부분(매직 넘버)으로 판단하고, 실패한 이미지는 건너뛰되 장면 순서는 유지합니다.
+'''
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_TIMEOUT = (5, 10)  # (연결, 읽기) 초
+CHUNK_SIZE = 64 * 1024
+MAX_WORKERS = 6
+MAX_ASSET_BYTES = 50 * 1024 * 1024
+
+# 파일 앞부분 -> 확장자
+SIGNATURES = (
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+    (b'BM', 'bmp'),
+)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """이미지 다운로드에 공유하는 keep-alive 세션"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS, max_retries=1)
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+        return _session
+
+
+def sniff_extension(head: bytes, content_type: str = '') -> Optional[str]:
+    """파일 앞부분으로 이미지 형식을 판단합니다. 알 수 없으면 Content-Type, 그래도 모르면 None."""
+    for signature, extension in SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    content_type = (content_type or '').lower()
+    for name, extension in (('jpeg', 'jpg'), ('jpg', 'jpg'), ('png', 'png'), ('webp', 'webp'), ('gif', 'gif')):
+        if name in content_type:
+            return extension
+    return None
+
+
+class AssetResult:
+    """입력 하나의 처리 결과. path 가 None 이면 실패이고 error 에 이유가 들어있습니다."""
+    def __init__(self, index: int, source: str, path: Optional[str] = None, error: Optional[str] = None):
+        self.index = index
+        self.source = source
+        self.path = path
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.path is not None
+
+    def to_dict(self) -> dict:
+        return {'index': self.index, 'error': self.error}
+
+
+def _finish(tmp_path: str, dest_dir: str, name: str, head: bytes, content_type: str = '') -> str:
+    extension = sniff_extension(head, content_type)
+    if extension is None:
+        os.remove(tmp_path)
+        raise ValueError('이미지 형식이 아닙니다')
+    path = os.path.join(dest_dir, f'{name}.{extension}')
+    os.replace(tmp_path, path)
+    return path
+
+
+def save_data_url(data_url: str, dest_dir: str, name: str) -> str:
+    """data:image/...;base64, 형식의 이미지를 파일로 저장합니다."""
+    _, encoded = data_url.split(',', 1)
+    data = base64.b64decode(encoded)
+    tmp_path = os.path.join(dest_dir, f'{name}.part')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    return _finish(tmp_path, dest_dir, name, data[:16])
+
+
+def download(url: str, dest_dir: str, name: str) -> str:
+    """URL 의 이미지를 나눠서 받아 파일로 저장합니다."""
+    tmp_path = os.path.join(dest_dir, f'{name}.part')
+    with get_session().get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+        if response.status_code != 200:
+            raise ValueError(f'HTTP {response.status_code}')
+        head = b''
+        size = 0
+        with open(tmp_path, 'wb') as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                if len(head) < 16:
+                    head += chunk[:16 - len(head)]
+                size += len(chunk)
+                if size > MAX_ASSET_BYTES:
+                    raise ValueError(f'파일이 너무 큽니다 ({MAX_ASSET_BYTES // (1024 * 1024)}MB 초과)')
+                f.write(chunk)
+        content_type = response.headers.get('content-type', '')
+    return _finish(tmp_path, dest_dir, name, head, content_type)
+
+
+def fetch_asset(index: int, source: str, dest_dir: str, prefix: str) -> AssetResult:
+    name = f'{prefix}_{index}'
+    try:
+        if source.startswith('data:image'):
+            path = save_data_url(source, dest_dir, name)
+        elif source.startswith('http'):
+            path = download(source, dest_dir, name)
+            logger.info(f"Downloaded image {index} from {source}")
+        else:
+            return AssetResult(index, source, error=f'지원하지 않는 형식: {source[:50]}...')
+        return AssetResult(index, source, path)
+    except Exception as e:
+        part = os.path.join(dest_dir, f'{name}.part')
+        if os.path.exists(part):
+            os.remove(part)
+        return AssetResult(index, source, error=str(e))
+
+
+def fetch_assets(sources: list, dest_dir: str, prefix: str = 'input', max_workers: int = MAX_WORKERS) -> List[AssetResult]:
+    """
+    이미지들을 동시에 dest_dir 에 저장합니다. 결과는 sources 와 같은 순서이며, 실패한 항목은 error 가 채워집니다.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    workers = max(1, min(max_workers, len(sources)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda item: fetch_asset(item[0], item[1], dest_dir, prefix), enumerate(sources)))
+    for result in results:
+        if not result.ok:
+            logger.error(f"Error processing image {result.index}: {result.error}")
+    return results
@@ -1,6 +1,5 @@
 import os
 import sys
-import dotenv
 import logging
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QWidget, QLabel, QComboBox,
@@ -8,6 +7,7 @@ from PyQt5.QtWidgets import (
     QDialog, QDialogButtonBox, QSizePolicy # Import QDialog and QDialogButtonBox for the interval pop-up
 )
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from settings import get_settings
 from selenium.common.exceptions import (
     StaleElementReferenceException, TimeoutException, NoSuchElementException,
     NoSuchWindowException, WebDriverException
@@ -395,7 +395,7 @@ class MenuGUI(QMainWindow):
              return
 
         try:
-            options_str = dotenv.get_key(self.env_file_path, env_key)
+            options_str = get_settings().get(self.env_file_path, env_key)
             if options_str:
                 options = [opt.strip() for opt in options_str.split(',') if opt.strip()]
                 if options:
@@ -451,7 +451,7 @@ class MenuGUI(QMainWindow):
         if not self.env_file_path: return
 
         try:
-            all_categories_str = dotenv.get_key(self.env_file_path, 'TISTORY_CATEGORY')
+            all_categories_str = get_settings().get(self.env_file_path, 'TISTORY_CATEGORY')
             if not all_categories_str:
                 logging.warning("TISTORY_CATEGORY 환경 변수가 설정되지 않았습니다.")
                 self.tistory_category_combo.addItem("카테고리 설정 없음")
@@ -538,8 +538,9 @@ class MenuGUI(QMainWindow):
         if not self.env_file_path: return
 
         try:
-            user_ids_str = dotenv.get_key(self.env_file_path, 'KAKAO_USERNAME')
-            passwords_str = dotenv.get_key(self.env_file_path, 'KAKAO_PASSWORD')
+            config = get_settings()
+            user_ids_str = config.get(self.env_file_path, 'KAKAO_USERNAME')
+            passwords_str = config.get(self.env_file_path, 'KAKAO_PASSWORD')
 
             if not user_ids_str or not passwords_str:
                 logging.warning("KAKAO_USERNAME 또는 KAKAO_PASSWORD 환경 변수가 .env 파일에 설정되지 않았습니다.")
@@ -655,7 +656,7 @@ class MenuGUI(QMainWindow):
 
              if current_use_naver_combo and current_use_naver_combo.currentText() == "아니요":
                  if self.selected_platform == "Tistory":
-                      use_my_links = dotenv.get_key(self.env_file_path, 'USE_MY_COUPANG_LINKS') == 'True'
+                      use_my_links = get_settings().get_bool(self.env_file_path, 'USE_MY_COUPANG_LINKS')
                       if not use_my_links:
                           needs_keyword_input = True
                  else:
@@ -687,7 +688,7 @@ class MenuGUI(QMainWindow):
             self.selected_ch_id = self.tistory_channel_combo.currentText().strip()
             self.selected_tistory_domain = self.tistory_domain_combo.currentText().strip()
             self.selected_category = self.tistory_category_combo.currentText().strip()
-            self.use_coupang_link_config = dotenv.get_key(self.env_file_path, 'USE_MY_COUPANG_LINKS') == 'True'
+            self.use_coupang_link_config = get_settings().get_bool(self.env_file_path, 'USE_MY_COUPANG_LINKS')
 
             if is_writing_mode:
                 if not self.selected_id: is_valid = False; msg = "카카오 계정을 선택해주세요."
@@ -1,28 +1,96 @@
 import queue
 import os
 import base64
-import dotenv
 import time
 import requests
 import re
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 from io import BytesIO
-from typing import Dict
-from openai import OpenAI
+from typing import Dict, Optional
+from openai_client import get_openai_client, ASSISTANTS_HEADERS
+from settings import get_settings
+from llm_cache import get_llm_cache, make_key
 
 
 '''
 OPEN AI Wapper 클래스. 현재는 GPT Asistant API를 사용중에 있음. 
 GPT API 유료 결제 이후 Asistant 를 생성하고 생성 옵션을 작성해줘야 함. 
 '''
+# 실행(run) 이 끝난 상태. 이 상태가 되면 더 기다리지 않음
+RUN_TERMINAL_STATUSES = ('completed', 'failed', 'cancelled', 'expired', 'incomplete', 'requires_action')
+# 스트리밍에서 실행이 끝났음을 알리는 이벤트
+RUN_TERMINAL_EVENTS = tuple(f'thread.run.{status}' for status in RUN_TERMINAL_STATUSES)
+# 스트리밍을 쓸 수 없을 때의 상태 조회 간격(초). 짧게 시작해 POLL_MAX_INTERVAL 까지 늘림
+POLL_INITIAL_INTERVAL = 0.25
+POLL_MAX_INTERVAL = 2.0
+POLL_BACKOFF = 1.5
+# 리뷰 요약/가이드/소개/제목 생성 모델과 프롬프트 버전. 프롬프트를 고치면 버전을 올려 이전 캐시를 사용하지 않도록 함
+LLM_MODEL = "gpt-4o-mini"
+PROMPT_VERSIONS = {'summary': 1, 'guide': 1, 'description': 1, 'title': 1, 'copy': 1, 'image': 1}
+# 글에 그대로 들어가는 문구. 같은 문구가 여러 블로그에 계속 올라가지 않도록 캐시 유효기간을 따로 둠
+GENERATIVE_KINDS = ('guide', 'description', 'title', 'copy')
+# get_post_copy 로 한 번에 만들 수 있는 항목
+POST_COPY_FIELDS = ('description', 'guide', 'title')
+# DALL·E 이미지 저장 위치, 크기, JPEG 품질
+IMAGE_MODEL = "dall-e-3"
+IMAGE_DIR = 'images'
+IMAGE_SIZE = (256, 256)
+IMAGE_QUALITY = 85
+IMAGE_DOWNLOAD_TIMEOUT = 30
+IMAGE_CHUNK_SIZE = 64 * 1024
+# 이미지 다운로드용 keep-alive 세션
+_image_session = requests.Session()
+
 class OpenAIWrapper:
     
     
     def __init__(self):
         self.file = '.env'
-        self._api_key = dotenv.get_key(self.file, 'OPEN_AI_KEY')
-        self._my_assistant_id = dotenv.get_key(self.file, 'MY_ASSISTANT_ID') 
-        self._client = OpenAI(api_key=self._api_key, default_headers={"OpenAI-Beta": "assistants=v2"})
+        config = get_settings()
+        self._api_key = config.get(self.file, 'OPEN_AI_KEY')
+        self._my_assistant_id = config.get(self.file, 'MY_ASSISTANT_ID') 
+        # 프로세스 전체에서 공유하는 클라이언트 (연결 풀 재사용)
+        self._client = get_openai_client(self._api_key, ASSISTANTS_HEADERS)
+        self._summary_workers = config.get_int(self.file, 'GPT_SUMMARY_CONCURRENCY', 4)
+        self._request_interval = config.get_float(self.file, 'GPT_REQUEST_INTERVAL', 0.2)
+        self._request_lock = threading.Lock()
+        self._last_request_at = 0.0
+        self._use_stream = config.get_bool(self.file, 'GPT_ASSISTANT_STREAM', True)
+        # 마지막 Assistant 실행의 지표: 방식(stream/poll), 첫 토큰까지 시간(ttft), 전체 시간(total), 초 단위
+        self.last_run_metrics = {}
+        # 프로세스 전체에서 공유하는 GPT 응답 캐시. LLM_CACHE_BYPASS 에 적은 종류(summary, guide, description, title)는 항상 새로 요청
+        self._cache = get_llm_cache(max_bytes=int(config.get_float(self.file, 'LLM_CACHE_MAX_MB', 50) * 1024 * 1024))
+        # 종류별 캐시 유효기간(초). 0 이면 기한 없음. 가이드/소개/제목은 LLM_CACHE_GENERATIVE_TTL_HOURS (기본 24시간)
+        ttl_hours = config.get_float(self.file, 'LLM_CACHE_TTL_HOURS', 0)
+        generative_ttl_hours = config.get_float(self.file, 'LLM_CACHE_GENERATIVE_TTL_HOURS', 24)
+        self._cache_ttls = {
+            kind: (generative_ttl_hours if kind in GENERATIVE_KINDS else ttl_hours) * 3600
+            for kind in PROMPT_VERSIONS
+        }
+        self._cache_bypass = set(config.get_list(self.file, 'LLM_CACHE_BYPASS'))
+
+    def _wait_request_slot(self):
+        '''동시 요청 시 요청 시작 간격을 GPT_REQUEST_INTERVAL 초 이상으로 유지합니다.'''
+        with self._request_lock:
+            wait = self._last_request_at + self._request_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_request_at = time.monotonic()
+
+    def _get_cached(self, kind: str, *inputs, model: str = LLM_MODEL) -> tuple:
+        '''(캐시 키, 저장된 응답). 캐시를 사용하지 않는 종류이면 (None, None)'''
+        if kind in self._cache_bypass:
+            return None, None
+        key = make_key(model, kind, PROMPT_VERSIONS[kind], *inputs)
+        return key, self._cache.get(key, kind, self._cache_ttls.get(kind))
+
+    def _set_cached(self, kind: str, key: Optional[str], value: str) -> None:
+        if key is not None and value:
+            self._cache.set(key, value, kind)
             
     def get_gpt_blog(self, keyword: str, use_assistant: bool = True) -> Dict[str, str]:
         if not self._api_key or not self._my_assistant_id:
@@ -34,7 +102,7 @@ class OpenAIWrapper:
             response =  self.get_thread_response(keyword)
             print(response)
             title, tags, slug, content = self.parse_response(response)
-            if dotenv.get_key(self.file, 'USE_GPT_IMAGE_CREATION') == 'True':
+            if get_settings().get_bool(self.file, 'USE_GPT_IMAGE_CREATION'):
                 img = self.generate_image(slug)
                 return {
                     "title": title,
@@ -55,37 +123,105 @@ class OpenAIWrapper:
             
     '''
     GPT Asistant API를 사용하여 게시글을 작성합니다. 
+    실행 결과를 스트리밍으로 받아 완료되는 즉시 반환하고, 스트리밍을 쓸 수 없으면 짧은 간격부터 늘려가며 상태를 조회합니다.
     '''
     def get_thread_response(self, keyword: str) -> str:
+        started = time.monotonic()
         thread = self._client.beta.threads.create()
         self._client.beta.threads.messages.create(
             thread_id=thread.id,
             role="user",
             content=keyword,
         )
-        run = self._client.beta.threads.runs.create(
-            thread_id=thread.id,
-            assistant_id=self._my_assistant_id
-        )
+        run_id = None
+        if self._use_stream:
+            try:
+                return self._stream_run(thread.id, started)
+            except _StreamInterrupted as e:
+                print(f'스트리밍 중단, 상태 조회로 전환합니다: {e.error}')
+                run_id = e.run_id
+            except (AttributeError, TypeError) as e:
+                # 스트리밍을 지원하지 않는 openai 패키지
+                print(f'스트리밍을 사용할 수 없어 상태 조회로 전환합니다: {e}')
+        return self._poll_run(thread.id, started, run_id)
+
+    def _stream_run(self, thread_id: str, started: float) -> str:
+        ttft = None
+        run_id = None
+        run = None
+        print('글 작성중...')
+        try:
+            with self._client.beta.threads.runs.stream(
+                thread_id=thread_id,
+                assistant_id=self._my_assistant_id
+            ) as stream:
+                for event in stream:
+                    if event.event == 'thread.run.created':
+                        run_id = event.data.id
+                    elif event.event == 'thread.message.delta' and ttft is None:
+                        ttft = time.monotonic() - started
+                    elif event.event in RUN_TERMINAL_EVENTS:
+                        run = event.data
+                        if run.status != 'completed':
+                            break
+                messages = stream.get_final_messages() if run is not None and run.status == 'completed' else []
+        except (AttributeError, TypeError) as e:
+            if run_id is None:
+                # 스트리밍을 지원하지 않는 openai 패키지. 실행이 만들어지지 않았으므로 새로 실행
+                raise
+            raise _StreamInterrupted(run_id, e)
+        except Exception as e:
+            # 연결 오류 등. 이미 시작된 실행이 있으면 그 실행을 이어서 조회
+            raise _StreamInterrupted(run_id, e)
+        if run is None:
+            # 실행 종료 이벤트 없이 스트림이 끝난 경우
+            raise _StreamInterrupted(run_id, Exception('실행 종료 이벤트 없이 스트림이 끝났습니다.'))
+        # 상태 조회 방식과 같이 completed 가 아니면 실패 (requires_action, incomplete 포함)
+        if run.status != 'completed':
+            raise Exception(run.last_error or run.status)
+        if not messages:
+            raise Exception('응답 메시지가 없습니다.')
+        self.last_run_metrics = {'mode': 'stream', 'ttft': ttft, 'total': time.monotonic() - started}
+        print(f"글 작성 완료 (첫 응답 {ttft or 0:.1f}초, 전체 {self.last_run_metrics['total']:.1f}초)")
+        return messages[-1].content[0].text.value
 
+    def _poll_run(self, thread_id: str, started: float, run_id: Optional[str] = None) -> str:
+        if run_id is None:
+            run_id = self._client.beta.threads.runs.create(
+                thread_id=thread_id,
+                assistant_id=self._my_assistant_id
+            ).id
+        interval = POLL_INITIAL_INTERVAL
+        print('글 작성중...')
         while True:
             run_status = self._client.beta.threads.runs.retrieve(
-                thread_id=thread.id,
-                run_id=run.id
+                thread_id=thread_id,
+                run_id=run_id
             )
-            print('글 작성중...')
-            if run_status.status in ["completed", "failed"]:
-                if run_status.status == "failed":
-                    raise Exception(run_status.last_error)
+            if run_status.status in RUN_TERMINAL_STATUSES:
+                if run_status.status != "completed":
+                    raise Exception(run_status.last_error or run_status.status)
                 break
-            time.sleep(5)
-        messages = self._client.beta.threads.messages.list(thread_id=thread.id)
+            time.sleep(interval)
+            interval = min(POLL_MAX_INTERVAL, interval * POLL_BACKOFF)
+        messages = self._client.beta.threads.messages.list(thread_id=thread_id)
+        total = time.monotonic() - started
+        # 상태 조회 방식에서는 첫 토큰 시점을 알 수 없으므로 전체 시간과 같음
+        self.last_run_metrics = {'mode': 'poll', 'ttft': total, 'total': total}
+        print(f"글 작성 완료 (전체 {total:.1f}초)")
         return messages.data[0].content[0].text.value
             
-    def generate_image(self, prompt: str, n: int = 1, size: str = '1024x1024', quality='standard') -> BytesIO:
-        """DALL·E를 사용하여 이미지를 생성하고 로컬 이미지로 변환. """
+    def generate_image(self, prompt: str, n: int = 1, size: str = '1024x1024', quality='standard') -> str:
+        """
+        DALL·E를 사용하여 이미지를 생성하고 작은 JPEG 로 저장한 경로를 반환합니다.
+        같은 프롬프트는 캐시된 이미지를 사용하고(LLM_CACHE_BYPASS 에 image 를 적으면 항상 새로 생성),
+        파일 이름은 이미지 내용의 해시라 같은 이미지는 한 번만 저장됩니다.
+        """
+        key, cached = self._get_cached('image', prompt, size, quality, IMAGE_SIZE, IMAGE_QUALITY, model=IMAGE_MODEL)
+        if cached is not None and os.path.exists(cached):
+            return cached
         response = self._client.images.generate(
-            model="dall-e-3",
+            model=IMAGE_MODEL,
             prompt=prompt,
             size=size,
             quality=quality,
@@ -94,23 +230,31 @@ class OpenAIWrapper:
         print('이미지 생성중..')
         image_url = response.data[0].url
         
-        # 이미지 URL에서 이미지 데이터를 다운로드
-        response = requests.get(image_url)
-        image_data = BytesIO(response.content)
-        # 이미지 사이즈 
-        new_width = 256
-        new_height = 256
-        image = Image.open(BytesIO(response.content))
+        # 이미지 URL에서 이미지 데이터를 나눠서 다운로드
+        buffer = BytesIO()
+        with _image_session.get(image_url, stream=True, timeout=IMAGE_DOWNLOAD_TIMEOUT) as r:
+            r.raise_for_status()
+            for chunk in r.iter_content(IMAGE_CHUNK_SIZE):
+                buffer.write(chunk)
+        buffer.seek(0)
 
-        resized_image = image.resize((new_width, new_height))
+        # 한 번만 디코딩. draft 는 JPEG 이면 축소된 크기로 디코딩하고, thumbnail 은 단계적으로 줄여 빠르게 리사이즈
+        image = Image.open(buffer)
+        image.draft('RGB', IMAGE_SIZE)
+        image = image.convert('RGB')
+        image.thumbnail(IMAGE_SIZE, Image.LANCZOS, reducing_gap=2.0)
 
-    
-        # 이미지 파일 이름
-        image_filename = f"{prompt}.png"
-        # 이미지를 로컬 'images/' 디렉토리에 저장
-        resized_image.save(f"images/{image_filename}")
-
-        return f"images/{image_filename}"        
+        output = BytesIO()
+        image.save(output, format='JPEG', quality=IMAGE_QUALITY, optimize=True, progressive=True)
+        data = output.getvalue()
+        # 이미지를 로컬 'images/' 디렉토리에 내용 해시 이름으로 저장
+        os.makedirs(IMAGE_DIR, exist_ok=True)
+        image_path = f"{IMAGE_DIR}/{hashlib.sha256(data).hexdigest()[:20]}.jpg"
+        if not os.path.exists(image_path):
+            with open(image_path, 'wb') as f:
+                f.write(data)
+        self._set_cached('image', key, image_path)
+        return image_path
      
     def generate_text(self, prompt: str, model: str = "text-davinci-003", max_tokens: int = 100) -> str:
         """일반적인 텍스트 생성 API를 호출하여 주어진 프롬프트에 대한 텍스트를 생성합니다."""
@@ -134,10 +278,14 @@ class OpenAIWrapper:
         return title, tags, slug, content
     
     def get_gpt_summary(self, review_content):
+        key, cached = self._get_cached('summary', review_content)
+        if cached is not None:
+            return cached
         try:
             print('GPT가 리뷰를 요약중입니다.')
+            self._wait_request_slot()
             completion = self._client.chat.completions.create(
-                model="gpt-4o-mini",
+                model=LLM_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant."},
                     {
@@ -148,18 +296,32 @@ class OpenAIWrapper:
             )
             res = completion.choices[0].message.content
             res = re.sub(r'```html|```', '', res).strip()
+            self._set_cached('summary', key, res)
             return res
         except Exception as e:
             print(f"GPT 리뷰 요약 에러 발생: {e}")
             return ""
+
+    def get_gpt_summaries(self, review_contents: list, max_workers: Optional[int] = None) -> list:
+        '''
+        여러 상품의 리뷰를 동시에 요약합니다. 결과는 review_contents 순서대로이며 실패한 항목은 빈 문자열입니다.
+        '''
+        if not review_contents:
+            return []
+        workers = max(1, min(int(max_workers or self._summary_workers), len(review_contents)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.get_gpt_summary, review_contents))
      
     
     def get_product_guide(self, product):
         
+        key, cached = self._get_cached('guide', product)
+        if cached is not None:
+            return cached
         try:
             print('GPT가 제품 선택 가이드를 작성 중입니다.')
             completion = self._client.chat.completions.create(
-                model="gpt-4o-mini",
+                model=LLM_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant."},
                     {
@@ -170,6 +332,7 @@ class OpenAIWrapper:
             )
             res = completion.choices[0].message.content
             res = re.sub(r'```html|```', '', res).strip()
+            self._set_cached('guide', key, res)
             return res
         except Exception as e:
             print(f"GPT 가이드 작성 에러 발생: {e}")
@@ -177,10 +340,13 @@ class OpenAIWrapper:
         
     def get_product_description(self, product):
         
+        key, cached = self._get_cached('description', product)
+        if cached is not None:
+            return cached
         try:
             print('GPT가 포스팅 소개구문을 작성 중입니다.')
             completion = self._client.chat.completions.create(
-                model="gpt-4o-mini",
+                model=LLM_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a helpful blog specialist."},
                     {
@@ -200,15 +366,19 @@ class OpenAIWrapper:
             res = completion.choices[0].message.content
             # print(res)
             res = re.sub(r'```html|```', '', res).strip()
+            self._set_cached('description', key, res)
             return res
         except Exception as e:
             print(f"GPT 가이드 작성 에러 발생: {e}")
             return "" 
     def get_post_title(self, product, nth):
+        key, cached = self._get_cached('title', product, nth)
+        if cached is not None:
+            return cached
         try:
             print('GPT가 포스트 제목을 작성 중입니다.')
             completion = self._client.chat.completions.create(
-                model="gpt-4o-mini",
+                model=LLM_MODEL,
                 messages=[
                     {"role": "system", "content": "You are a helpful blog specialist."},
                     {
@@ -231,9 +401,84 @@ class OpenAIWrapper:
             # print(res)
             # 코드 블록 안의 문자열만 추출 (```html ~ ```)
             res = re.sub(r'```html|```', '', res).strip()
+            self._set_cached('title', key, res)
 
             return res
         except Exception as e:
             print(f"GPT 가이드 작성 에러 발생: {e}")
             return ""
-    
\ No newline at end of file
+    
+
+
+    def get_post_copy(self, product, nth, fields: tuple = POST_COPY_FIELDS) -> dict:
+        '''
+        소개 문구(description), 구매 가이드(guide), 제목(title) 중 fields 에 있는 항목을 JSON 응답 한 번으로 작성합니다.
+        응답이 JSON 이 아니거나 빠진 항목이 있으면 그 항목만 개별 함수로 다시 작성합니다.
+        '''
+        fields = tuple(f for f in POST_COPY_FIELDS if f in fields)
+        key, cached = self._get_cached('copy', product, nth, ','.join(fields))
+        result = {}
+        if cached is not None:
+            result = json.loads(cached)
+        elif fields:
+            instructions = {
+                'description': (
+                    "상품에 대한 설명이나 기능, 특징을 추측하지 말고, 오늘 어떤 상품을 소개할지, 사람들이 많이 찾고 있다는 점, "
+                    "지금 확인해보자는 안내 등으로 쇼핑 전문 블로거가 쓴 것처럼 친근하면서도 분위기 있게 이모지를 섞어 500자 내외로 작성한 블로그 소개 멘트. "
+                    "HTML 태그를 포함하고 태그 안에는 순수한 소개 문장만"
+                ),
+                'guide': (
+                    "어떤 기준으로 구매해야 좋은 제품을 구매할 수 있는지 알려주는 전문적인 구매 가이드. "
+                    "이모지를 섞어 200자 내외, html <ul><li> 리스트 형태"
+                ),
+                'title': (
+                    f"상품 {nth}개를 소개하는 블로그 제목 1개. 매번 새로운 스타일로, 사람들이 많이 검색할 만한 "
+                    "길지 않고 눈에 띄는 문구 (예: 트렌디한 상품명 탑5). HTML 태그 없이 제목만"
+                ),
+            }
+            try:
+                print('GPT가 포스트 문구를 작성 중입니다.')
+                completion = self._client.chat.completions.create(
+                    model=LLM_MODEL,
+                    response_format={"type": "json_object"},
+                    messages=[
+                        {"role": "system", "content": "You are a helpful blog specialist. Always answer with a single JSON object."},
+                        {
+                            "role": "user",
+                            "content": (
+                                f"다음 상품 키워드로 블로그 포스트 문구를 작성해서 JSON 객체로만 출력해줘. "
+                                f"키는 {', '.join(fields)} 이고 값은 모두 문자열이야.\n"
+                                + "\n".join(f"- {field}: {instructions[field]}" for field in fields)
+                                + f"\n상품 키워드: {product}"
+                            )
+                        }
+                    ]
+                )
+                data = json.loads(completion.choices[0].message.content)
+                # 문자열이고 비어있지 않은 항목만 사용
+                result = {
+                    field: data[field].strip() for field in fields
+                    if isinstance(data.get(field), str) and data[field].strip()
+                }
+                if len(result) == len(fields):
+                    self._set_cached('copy', key, json.dumps(result, ensure_ascii=False))
+            except Exception as e:
+                print(f"GPT 포스트 문구 작성 에러 발생: {e}")
+        # 빠진 항목은 개별 호출로 작성
+        fallback = {
+            'description': lambda: self.get_product_description(product),
+            'guide': lambda: self.get_product_guide(product),
+            'title': lambda: self.get_post_title(product, nth),
+        }
+        for field in fields:
+            if field not in result:
+                result[field] = fallback[field]()
+        return result
+
+
+class _StreamInterrupted(Exception):
+    '''스트리밍 연결이 끊긴 경우. 실행이 이미 시작되었으면(run_id) 같은 실행을 상태 조회로 이어서 기다림'''
+    def __init__(self, run_id: Optional[str], error: Exception):
+        super().__init__(str(error))
+        self.run_id = run_id
+        self.error = error
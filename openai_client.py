@@ -0,0 +1,67 @@
+import threading
+import httpx
+from openai import OpenAI
+from settings import get_settings
+from typing import Optional
+
+try:
+    import h2  # noqa: F401  HTTP/2 는 h2 패키지가 설치된 경우에만 사용
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+'''
+프로세스 전체에서 공유하는 OpenAI 클라이언트.
+OpenAIWrapper 를 만들 때마다 새 OpenAI 클라이언트(와 HTTP 연결 풀)를 만들지 않도록 API 키별로 하나만 만들어 재사용합니다.
+연결은 keep-alive 로 유지되고 h2 패키지가 있으면 HTTP/2 를 사용합니다. OpenAI 클라이언트는 여러 스레드에서 함께 사용해도 안전합니다.
+
+설정 (.env):
+    OPENAI_MAX_CONNECTIONS  - 최대 동시 연결 수 (기본 20)
+    OPENAI_CONNECT_TIMEOUT  - 연결 제한 시간, 초 (기본 10)
+    OPENAI_READ_TIMEOUT     - 응답 제한 시간, 초 (기본 120, 스트리밍 중 이벤트 사이 간격에도 적용)
+    OPENAI_MAX_RETRIES      - 연결 오류/429/5xx 재시도 횟수 (기본 2)
+'''
+ASSISTANTS_HEADERS = {"OpenAI-Beta": "assistants=v2"}
+
+_lock = threading.Lock()
+_clients = {}
+
+
+def create_client(api_key: str, default_headers: Optional[dict] = None) -> OpenAI:
+    config = get_settings()
+    max_connections = config.get_int('.env', 'OPENAI_MAX_CONNECTIONS', 20)
+    connect_timeout = config.get_float('.env', 'OPENAI_CONNECT_TIMEOUT', 10.0)
+    read_timeout = config.get_float('.env', 'OPENAI_READ_TIMEOUT', 120.0)
+    timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+    http_client = httpx.Client(
+        http2=HTTP2_AVAILABLE,
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections, keepalive_expiry=60),
+    )
+    return OpenAI(
+        api_key=api_key,
+        default_headers=default_headers,
+        timeout=timeout,
+        max_retries=config.get_int('.env', 'OPENAI_MAX_RETRIES', 2),
+        http_client=http_client,
+    )
+
+
+def get_openai_client(api_key: str, default_headers: Optional[dict] = None) -> OpenAI:
+    """API 키와 기본 헤더가 같으면 같은 클라이언트를 반환합니다."""
+    key = (api_key, tuple(sorted((default_headers or {}).items())))
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = create_client(api_key, default_headers)
+            _clients[key] = client
+        return client
+
+
+def close_clients() -> None:
+    """공유 클라이언트의 연결을 모두 닫습니다. (프로세스 종료 시)"""
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
@@ -0,0 +1,188 @@
+import time
+import logging
+import functools
+import threading
+from urllib.parse import urlparse
+from typing import Optional
+
+
+'''
+호스트별 요청 속도 제한기.
+코드 곳곳의 time.sleep(1), random.uniform(10, 20) 같은 고정 대기 대신 호스트마다 토큰 버킷을 두고,
+429/403 응답을 받으면 속도를 절반으로 줄이고 정상 응답이 이어지면 조금씩 다시 올립니다.
+
+사용법:
+    rate_limiter.wait('api.naver.com')       # 요청 전 (토큰이 없으면 대기)
+    rate_limiter.report('api.naver.com', 200) # 응답 상태 코드 보고
+
+    @rate_limiter.limited('www.tistory.com')  # 브라우저로 요청해 상태 코드를 알 수 없는 작업
+    def write_post(...): ...                  # 제한 화면을 만나면 RateLimitedError 를 발생시킴
+'''
+# host: (초당 요청 수, 버스트, 최소 초당 요청 수, 최대 초당 요청 수)
+HOST_LIMITS = {
+    'partners.coupang.com': (4.0, 4, 0.2, 8.0),
+    'www.coupang.com': (2.0, 3, 0.1, 4.0),
+    'api.naver.com': (5.0, 5, 0.5, 10.0),
+    'openapi.naver.com': (8.0, 8, 0.5, 10.0),
+    'indexing.googleapis.com': (1.0, 1, 0.1, 2.0),
+    'www.googleapis.com': (0.2, 1, 0.02, 1.0),
+    'www.tistory.com': (0.5, 1, 0.05, 1.0),
+}
+DEFAULT_LIMIT = (1.0, 1, 0.1, 5.0)
+
+BACKOFF_STATUSES = (403, 429)
+BACKOFF_FACTOR = 0.5  # 제한 응답을 받으면 속도에 곱하는 값
+RECOVERY_FACTOR = 1.1  # 정상 응답이 RECOVERY_AFTER 번 이어지면 속도에 곱하는 값
+RECOVERY_AFTER = 10
+
+
+class RateLimitedError(Exception):
+    """상태 코드 없이 요청 제한을 확인한 경우 (제한 안내 화면 등). limited() 가 status 로 보고합니다."""
+    def __init__(self, message: str = '', status: int = 429, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Token bucket whose refill rate adapts to the responses reported for its host.
+    """
+    def __init__(self, rate: float, burst: int = 1, min_rate: float = 0.1, max_rate: float = 5.0):
+        self.rate = rate
+        self.initial_rate = rate
+        self.burst = max(1, burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._healthy = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """토큰을 하나 사용합니다. 토큰이 없으면 생길 때까지 기다리고, 기다린 시간(초)을 반환합니다."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._blocked_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = max(self._blocked_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+            waited += wait
+
+    def report(self, status: Optional[int], retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            if status in BACKOFF_STATUSES:
+                self.rate = max(self.min_rate, self.rate * BACKOFF_FACTOR)
+                self._tokens = 0.0
+                self._healthy = 0
+                if retry_after:
+                    self._blocked_until = time.monotonic() + retry_after
+            elif status is not None and 200 <= status < 400:
+                self._healthy += 1
+                if self._healthy >= RECOVERY_AFTER:
+                    self.rate = min(self.max_rate, self.rate * RECOVERY_FACTOR)
+                    self._healthy = 0
+
+
+class RateLimiter:
+    def __init__(self, limits: Optional[dict] = None):
+        self._limits = HOST_LIMITS if limits is None else limits
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def get_bucket(self, host: str) -> TokenBucket:
+        host = get_host(host)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(*self._limits.get(host, DEFAULT_LIMIT))
+                self._buckets[host] = bucket
+            return bucket
+
+    def wait(self, host: str) -> float:
+        return self.get_bucket(host).acquire()
+
+    def report(self, host: str, status: Optional[int], retry_after: Optional[float] = None) -> None:
+        bucket = self.get_bucket(host)
+        before = bucket.rate
+        bucket.report(status, retry_after)
+        if bucket.rate < before:
+            logging.warning(f"{get_host(host)} 요청 제한 응답({status}). 초당 요청 수 {before:.2f} -> {bucket.rate:.2f}")
+
+
+def get_host(url_or_host: str) -> str:
+    """URL 이 들어오면 호스트만 꺼냅니다."""
+    if '://' in url_or_host:
+        return urlparse(url_or_host).hostname or url_or_host
+    return url_or_host
+
+
+def get_retry_after(headers) -> Optional[float]:
+    """Retry-After 헤더(초 단위)를 읽습니다. 없거나 날짜 형식이면 None."""
+    try:
+        value = headers.get('Retry-After') or headers.get('retry-after')
+        return float(value)
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+rate_limiter = RateLimiter()
+
+
+def wait(host: str) -> float:
+    return rate_limiter.wait(host)
+
+
+def report(host: str, status: Optional[int], retry_after: Optional[float] = None) -> None:
+    rate_limiter.report(host, status, retry_after)
+
+
+def limited(host: str):
+    """
+    함수 한 번의 실행을 host 에 대한 요청 하나로 보고 속도 제한을 적용하는 데코레이터.
+    브라우저로 요청해 응답 상태 코드를 알 수 없는 작업에 사용하며, 성공하면 200 을 보고합니다.
+    RateLimitedError 는 그 status 로 보고해 속도를 줄이고, 그 외 예외(요소 없음, 로그인 실패 등)는 제한 신호가 아니므로 보고하지 않습니다.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            wait(host)
+            try:
+                result = func(*args, **kwargs)
+            except RateLimitedError as e:
+                report(host, e.status, e.retry_after)
+                raise
+            report(host, 200)
+            return result
+        return wrapper
+    return decorator
+
+
+def configure(host: str, rate: float, burst: Optional[int] = None) -> None:
+    """설정 파일 등에서 지정한 초당 요청 수로 호스트의 기본 속도와 최대 속도를 바꿉니다. 0 이하이면 기본값을 유지합니다."""
+    if not rate > 0:
+        logging.warning(f"{get_host(host)} 초당 요청 수는 0 보다 커야 합니다({rate}). 기본 속도를 사용합니다.")
+        return
+    bucket = rate_limiter.get_bucket(host)
+    with bucket._lock:
+        bucket.rate = bucket.initial_rate = bucket.max_rate = rate
+        bucket.min_rate = min(bucket.min_rate, rate)
+        bucket.burst = max(1, int(burst if burst is not None else rate))
+
+
+def get_slowdown(host: str) -> float:
+    """
+    제한 응답으로 속도가 처음보다 몇 배 느려졌는지(1 이상).
+    브라우저 안에서 직접 요청하는 경우 요청 간격을 늘리는 데 사용합니다.
+    """
+    bucket = rate_limiter.get_bucket(host)
+    return max(1.0, bucket.initial_rate / bucket.rate)
@@ -0,0 +1,167 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import threading
+from typing import Optional, Tuple
+
+'''
+렌더링 결과 캐시 (로컬 디스크).
+같은 이미지/길이/해상도/품질/오디오로 다시 요청된 비디오나 같은 텍스트/목소리의 TTS 를 다시 만들지 않도록
+정규화한 요청과 입력 파일의 해시를 키로 결과 파일을 저장합니다.
+전체 크기가 max_bytes 를 넘으면 가장 오래 사용하지 않은 파일부터 삭제합니다(파일 수정시간을 사용 시각으로 사용).
+
+저장 형식 (root 아래):
+    <key>.<ext>   결과 파일
+    <key>.json    결과와 함께 돌려줄 메타데이터
+    <key>.alias   다른 키를 가리키는 별칭 (요청 키 -> 내용 키)
+'''
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = 'render_cache'
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+
+def make_key(*parts) -> str:
+    """JSON 으로 정규화한 값들의 sha256."""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def file_digest(path: str) -> str:
+    """파일 내용의 sha256."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def link_or_copy(src: str, dst: str) -> None:
+    """같은 디스크면 하드 링크(복사 없음), 아니면 복사합니다."""
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+class RenderCache:
+    """
+    Content-addressed on-disk cache of rendered files with size-bounded LRU eviction.
+    Entries are written atomically, so several gunicorn workers can share one directory.
+    """
+    def __init__(self, root: str = CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.root, f'{key}.json')
+
+    def _alias_path(self, key: str) -> str:
+        return os.path.join(self.root, f'{key}.alias')
+
+    def _resolve(self, key: str) -> str:
+        try:
+            with open(self._alias_path(key), 'r', encoding='utf-8') as f:
+                return f.read().strip() or key
+        except OSError:
+            return key
+
+    def get(self, key: str) -> Optional[Tuple[str, dict]]:
+        """(결과 파일 경로, 메타데이터). 없으면 None. 사용 시각을 갱신합니다."""
+        key = self._resolve(key)
+        try:
+            with open(self._meta_path(key), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            path = os.path.join(self.root, meta['file'])
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return path, meta.get('data', {})
+
+    def fetch(self, key: str, dst_path: str) -> Optional[dict]:
+        """결과 파일을 dst_path 에 연결(또는 복사)하고 메타데이터를 반환합니다. 없거나 그 사이 삭제되었으면 None."""
+        cached = self.get(key)
+        if cached is None:
+            return None
+        path, data = cached
+        try:
+            link_or_copy(path, dst_path)
+        except OSError as e:
+            # 조회한 뒤 다른 워커가 용량 정리로 삭제한 경우 캐시 미스로 처리
+            logger.info(f"Render cache entry vanished: {e}")
+            return None
+        return data
+
+    def put(self, key: str, src_path: str, data: dict) -> str:
+        """src_path 파일을 캐시에 저장하고 저장된 경로를 반환합니다."""
+        extension = os.path.splitext(src_path)[1]
+        filename = f'{key}{extension}'
+        path = os.path.join(self.root, filename)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        link_or_copy(src_path, tmp_path)
+        os.replace(tmp_path, path)
+        # 하드 링크는 원본의 수정시간을 그대로 가지므로 사용 시각을 지금으로 갱신
+        os.utime(path)
+        meta_tmp = f'{self._meta_path(key)}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(meta_tmp, 'w', encoding='utf-8') as f:
+            json.dump({'file': filename, 'data': data}, f, ensure_ascii=False)
+        os.replace(meta_tmp, self._meta_path(key))
+        self.evict()
+        return path
+
+    def alias(self, key: str, target_key: str) -> None:
+        """key 로 조회하면 target_key 의 결과를 돌려주도록 별칭을 만듭니다."""
+        if key == target_key:
+            return
+        tmp_path = f'{self._alias_path(key)}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(target_key)
+        os.replace(tmp_path, self._alias_path(key))
+
+    def evict(self) -> None:
+        """전체 크기가 max_bytes 이하가 될 때까지 가장 오래 사용하지 않은 결과를 삭제합니다."""
+        with self._lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.root):
+                if name.endswith(('.json', '.alias', '.tmp')):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.root, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+                total += stat.st_size
+            if total <= self.max_bytes:
+                return
+            evicted = set()
+            for _, size, name in sorted(entries):
+                key = os.path.splitext(name)[0]
+                for path in (os.path.join(self.root, name), self._meta_path(key)):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                evicted.add(key)
+                total -= size
+                logger.info(f"Render cache evicted {name} ({size} bytes)")
+                if total <= self.max_bytes:
+                    break
+            # 삭제한 결과를 가리키던 별칭도 함께 삭제
+            for name in os.listdir(self.root):
+                if not name.endswith('.alias'):
+                    continue
+                path = os.path.join(self.root, name)
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        target_key = f.read().strip()
+                    if target_key in evicted:
+                        os.remove(path)
+                except OSError:
+                    pass
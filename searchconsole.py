@@ -1,20 +1,22 @@
 import os
 import json
-import logging
 import time
-import random
-import dotenv
+import logging
+import rate_limiter
+from settings import get_settings
+from indexing_ledger import IndexingLedger, DAILY_QUOTA, normalize_entry
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from typing import Optional
 
 # --- Configuration ---
 URL_FILE = 'index.json'
 ENV_FILE = 'searchconsole.env'
 
 # --- Load Environment Variables ---
-dotenv.load_dotenv(dotenv_path=ENV_FILE)
-SERVICE_ACCOUNT_FILE = os.getenv('GOOGLE_SERVICE_ACCOUNT_PATH')
+# 시스템 환경변수가 있으면 우선 사용 (기존 load_dotenv 와 동일한 우선순위)
+SERVICE_ACCOUNT_FILE = os.getenv('GOOGLE_SERVICE_ACCOUNT_PATH') or get_settings().get(ENV_FILE, 'GOOGLE_SERVICE_ACCOUNT_PATH')
 
 # --- Logging Setup ---
 log_format = '%(asctime)s - %(levelname)s - %(message)s'
@@ -26,8 +28,14 @@ logging.basicConfig(level=logging.INFO, format=log_format,
 INDEXING_API_SCOPE = ['https://www.googleapis.com/auth/indexing']
 API_SERVICE_NAME = 'indexing'
 API_VERSION = 'v3'
-# API 호출 사이의 딜레이 (초) - 속도 제한 방지
-DELAY_BETWEEN_REQUESTS = (1.5, 3.0) # 최소 1.5초, 최대 3.0초 랜덤 딜레이
+# API 호출 속도 제한은 rate_limiter 가 호스트 단위로 관리 (429/403 응답 시 자동 감속)
+INDEXING_API_HOST = 'indexing.googleapis.com'
+# 배치 요청 하나에 담을 수 있는 최대 URL 수 (Google API 배치 제한)
+BATCH_SIZE = 100
+# 429/5xx 로 실패한 URL 만 다시 시도하는 횟수와 첫 대기 시간(초, 시도마다 두 배)
+BATCH_MAX_RETRIES = 3
+BATCH_RETRY_DELAY = 2.0
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
 
 class SearchConsoleIndexer:
     """
@@ -37,6 +45,8 @@ class SearchConsoleIndexer:
     def __init__(self):
         self.credentials = None
         self.service = None
+        # 이미 등록한 URL 은 다시 요청하지 않도록 요청 기록을 유지 (하루 할당량: searchconsole.env INDEXING_DAILY_QUOTA)
+        self.ledger = IndexingLedger(daily_quota=get_settings().get_int(ENV_FILE, 'INDEXING_DAILY_QUOTA', DAILY_QUOTA))
 
     def authenticate(self) -> bool:
         """Authenticates using the service account file."""
@@ -60,7 +70,7 @@ class SearchConsoleIndexer:
             self.service = None
             return False
 
-    def read_urls(self) -> list | None:
+    def read_urls(self) -> Optional[list]:
         """Reads the list of URLs from the JSON file."""
         logging.info(f"URL 을 읽습니다.: {URL_FILE}")
         if not os.path.exists(URL_FILE):
@@ -97,13 +107,16 @@ class SearchConsoleIndexer:
         }
         logging.info(f"Submitting URL: {url}")
         try:
+            rate_limiter.wait(INDEXING_API_HOST)
             response = self.service.urlNotifications().publish(body=content).execute()
+            rate_limiter.report(INDEXING_API_HOST, 200)
             logging.info(f"API 응답 {url}: {response}")
             # 간단히 성공/실패만 반환 (응답 내용에 따라 더 상세한 확인 가능)
             return True
         except HttpError as error:
             status = error.resp.status
             reason = error.reason
+            rate_limiter.report(INDEXING_API_HOST, status, rate_limiter.get_retry_after(error.resp))
             details = '(No details)'
             try:
                 details = error.content.decode()
@@ -120,39 +133,125 @@ class SearchConsoleIndexer:
             logging.exception(f"Unexpected error submitting URL {url}.")
             return False
 
-    def process_urls(self, urls: list) -> None:
-        """Processes the list of URLs, submitting each for indexing with delays."""
+    def request_indexing_batch(self, urls: list) -> dict:
+        """
+        Submits up to BATCH_SIZE URLs in a single HTTP batch request.
+        Returns {url: status} where status is 200 on success, the HTTP status of the failed
+        sub-request, or None when the error carried no status.
+        """
+        results = {}
+        retry_after = []
+        if not self.service:
+            logging.error("Indexing service is not available. Cannot request indexing.")
+            return {url: None for url in urls}
+
+        def callback(request_id, response, exception):
+            url = urls[int(request_id)]
+            if exception is None:
+                results[url] = 200
+                logging.info(f"API 응답 {url}: {response}")
+                return
+            status = getattr(getattr(exception, 'resp', None), 'status', None)
+            results[url] = status
+            if status == 429:
+                retry_after.append(rate_limiter.get_retry_after(exception.resp))
+            logging.error(f"API Error for {url}: Status {status} {getattr(exception, 'reason', exception)}")
+
+        batch = self.service.new_batch_http_request(callback=callback)
+        for i, url in enumerate(urls):
+            batch.add(self.service.urlNotifications().publish(body={'url': url, 'type': 'URL_UPDATED'}), request_id=str(i))
+        logging.info(f"Submitting batch: {len(urls)} URLs")
+        rate_limiter.wait(INDEXING_API_HOST)
+        try:
+            batch.execute()
+        except HttpError as error:
+            # 배치 요청 자체가 실패하면 모든 URL 이 같은 상태로 실패
+            status = error.resp.status
+            rate_limiter.report(INDEXING_API_HOST, status, rate_limiter.get_retry_after(error.resp))
+            logging.error(f"Batch API Error: Status {status} {error.reason}")
+            return {url: status for url in urls}
+        except Exception:
+            logging.exception("Unexpected error submitting batch.")
+            return {url: None for url in urls}
+        # 하나라도 429 이면 제한 응답으로 보고해 다음 배치 속도를 줄임
+        if retry_after:
+            rate_limiter.report(INDEXING_API_HOST, 429, max((r for r in retry_after if r), default=None))
+        else:
+            rate_limiter.report(INDEXING_API_HOST, 200)
+        return results
+
+    def submit_batches(self, urls: list) -> dict:
+        """
+        Submits URLs in batches of BATCH_SIZE and retries only the URLs that failed with
+        429 or 5xx, with exponential backoff. Returns the final {url: status}.
+        """
+        results = {}
+        pending = list(urls)
+        for attempt in range(BATCH_MAX_RETRIES + 1):
+            if attempt > 0:
+                delay = BATCH_RETRY_DELAY * (2 ** (attempt - 1))
+                logging.info(f"{len(pending)}개 URL 재시도 ({attempt}/{BATCH_MAX_RETRIES}), {delay:.0f}초 후")
+                time.sleep(delay)
+            for start in range(0, len(pending), BATCH_SIZE):
+                results.update(self.request_indexing_batch(pending[start:start + BATCH_SIZE]))
+            pending = [url for url in pending if results.get(url) in RETRYABLE_STATUSES]
+            if not pending:
+                break
+        if any(status == 429 for status in results.values()):
+            logging.error("Quota Exceeded (429). Too many requests. Try again later or check quotas in Google Cloud Console. 너무 많은 요청을 하였습니다. 요청은 하루 200개 제한되어 있습니다.")
+        if any(status == 403 for status in results.values()):
+            logging.error("Permission Denied (403). Ensure the service account has 'Owner' permission in Search Console for the property containing this URL. 권한이 없습니다. 서비스 계정이 Search Console에서 이 URL을 포함하는 속성에 대해 '소유자' 권한을 가지고 있는지 확인하세요.")
+        return results
+
+    def process_urls(self, urls: list, batch: Optional[bool] = None) -> None:
+        """
+        Processes the list of URLs. Only new, changed or previously failed URLs are submitted,
+        up to the remaining daily quota (see IndexingLedger). Entries may be URL strings or
+        {"url": ..., "lastmod": ...} dicts. In batch mode (searchconsole.env INDEXING_BATCH_MODE,
+        default True) the URLs are sent in HTTP batch requests; otherwise each URL is submitted separately.
+        """
         if not urls:
             logging.info("URL 이 비어있습니다.")
             return
 
+        if batch is None:
+            batch = get_settings().get_bool(ENV_FILE, 'INDEXING_BATCH_MODE', True)
+
         total_urls = len(urls)
         success_count = 0
         failure_count = 0
 
         logging.info(f"--- URL 등록을 시작합니다. (Total: {total_urls}) ---")
 
-        for i, url in enumerate(urls):
+        valid_entries = []
+        for entry in urls:
+            url, lastmod = normalize_entry(entry)
             if not url or not isinstance(url, str) or not url.startswith(('http://', 'https://')):
-                logging.warning(f"잘못된 URL: {url}")
+                logging.warning(f"잘못된 URL: {entry}")
                 failure_count += 1
                 continue
+            valid_entries.append({'url': url, 'lastmod': lastmod})
 
-            if self.request_indexing(url):
-                success_count += 1
-            else:
-                failure_count += 1
+        # 새 URL > 바뀐 URL > 실패했던 URL 순으로 오늘 할당량만큼 선택
+        selected = self.ledger.select(valid_entries)
+        lastmods = dict(selected)
+        valid_urls = [url for url, _ in selected]
 
-            # 마지막 URL이 아니면 딜레이 추가
-            if i < total_urls - 1:
-                delay = random.uniform(DELAY_BETWEEN_REQUESTS[0], DELAY_BETWEEN_REQUESTS[1])
-                logging.info(f"다음 응답까지 {delay:.2f} 초...")
-                time.sleep(delay)
+        if batch and len(valid_urls) > 1:
+            results = self.submit_batches(valid_urls)
+        else:
+            results = {url: 200 if self.request_indexing(url) else None for url in valid_urls}
+        for url in valid_urls:
+            self.ledger.record(url, results.get(url), lastmods[url])
+        success_count = sum(1 for url in valid_urls if results.get(url) == 200)
+        failure_count += len(valid_urls) - success_count
+        skipped_count = len(valid_entries) - len(valid_urls)
 
         logging.info(f"--- URL 등록 끝 ---")
         logging.info(f"전체 URL : {total_urls}")
         logging.info(f"등록 성공 : {success_count}")
         logging.info(f"등록 실패: {failure_count}")
+        logging.info(f"건너뜀 (등록됨/할당량 초과): {skipped_count}")
 
 # --- Main Execution ---
 if __name__ == "__main__":
@@ -0,0 +1,96 @@
+import os
+import logging
+import threading
+from types import MappingProxyType
+from dotenv import dotenv_values
+from typing import Optional
+
+
+'''
+설정 파일(.env, blogger.env, tistory.env, searchconsole.env)을 한 번만 읽어 변경할 수 없는 스냅샷으로 제공합니다.
+dotenv.get_key() 는 호출할 때마다 파일을 다시 열고 파싱하므로, 대신 get_settings() 의 값을 사용합니다.
+파일이 디스크에서 바뀌면(수정시간/크기 변경) 그 파일만 다시 읽어 새 스냅샷을 만듭니다.
+
+사용법:
+    config = get_settings()
+    config.get('.env', 'COUPANG_USERNAME')
+    config.get_bool('blogger.env', 'USE_COUPANG_REVIEW')
+    config.get_int('.env', 'COUPANG_REVIEW_CONCURRENCY', 3)
+'''
+ENV_FILES = ('.env', 'blogger.env', 'tistory.env', 'searchconsole.env')
+
+_lock = threading.Lock()
+_snapshot = None
+_signatures = {}
+
+
+class Settings:
+    """
+    Immutable view over the parsed env files. Values are raw strings as written in the file;
+    the typed getters convert them and fall back to `default` when a key is missing or invalid.
+    """
+    def __init__(self, files: dict):
+        self._files = MappingProxyType({name: MappingProxyType(dict(values)) for name, values in files.items()})
+
+    def file(self, env_file: str):
+        return self._files.get(env_file, MappingProxyType({}))
+
+    def get(self, env_file: str, key: str, default: Optional[str] = None) -> Optional[str]:
+        value = self.file(env_file).get(key)
+        return default if value is None else value
+
+    def get_bool(self, env_file: str, key: str, default: bool = False) -> bool:
+        value = self.get(env_file, key)
+        if value is None or value == '':
+            return default
+        return value == 'True'
+
+    def get_int(self, env_file: str, key: str, default: Optional[int] = None) -> Optional[int]:
+        try:
+            return int(self.get(env_file, key))
+        except (TypeError, ValueError):
+            return default
+
+    def get_float(self, env_file: str, key: str, default: Optional[float] = None) -> Optional[float]:
+        try:
+            return float(self.get(env_file, key))
+        except (TypeError, ValueError):
+            return default
+
+    def get_list(self, env_file: str, key: str) -> list:
+        """쉼표로 구분된 값을 공백을 제거한 리스트로 반환합니다."""
+        value = self.get(env_file, key) or ''
+        return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def get_file_signature(path: str) -> Optional[tuple]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def get_settings(env_files: tuple = ENV_FILES) -> Settings:
+    """현재 설정 스냅샷. 설정 파일이 바뀐 경우에만 다시 읽습니다."""
+    global _snapshot
+    signatures = {name: get_file_signature(name) for name in env_files}
+    with _lock:
+        if _snapshot is not None and signatures == _signatures:
+            return _snapshot
+        files = {}
+        for name, signature in signatures.items():
+            if _snapshot is not None and _signatures.get(name) == signature:
+                files[name] = _snapshot.file(name)
+            elif signature is None:
+                files[name] = {}
+            else:
+                try:
+                    files[name] = dotenv_values(name)
+                except Exception as e:
+                    logging.warning(f"설정 파일 '{name}' 을 읽지 못했습니다: {e}")
+                    files[name] = {}
+        _snapshot = Settings(files)
+        _signatures.clear()
+        _signatures.update(signatures)
+        return _snapshot
@@ -0,0 +1,96 @@
+import os
+import random
+import threading
+from typing import Optional
+
+
+'''
+HTML 템플릿 저장소.
+배너/소개글/타이틀 배너를 만들 때마다 templates/*.html 파일을 다시 읽고,
+random 템플릿을 고를 때마다 os.listdir 하던 작업을 대신합니다.
+프로세스 전체에서 디렉토리마다 하나의 저장소를 공유하며, 파일 수정시간(mtime)이 바뀐 템플릿만 다시 읽습니다.
+'''
+class TemplateRegistry:
+    """
+    Keeps the contents of every template under `root` in memory, keyed by path.
+    Entries and the random-eligible name list are reloaded when the file or directory mtime changes.
+    """
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        self._templates = {}  # path -> (mtime, content)
+        self._eligible = None  # (directory mtime, [템플릿 이름])
+
+    def get_path(self, template_name: str, template_dic: Optional[str] = None) -> str:
+        if template_dic is None:
+            return os.path.join(self.root, f"{template_name}.html")
+        return os.path.join(self.root, template_dic, f"{template_name}.html")
+
+    def preload(self) -> None:
+        """루트와 하위 폴더의 .html 템플릿을 모두 미리 읽어둡니다."""
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith('.html'):
+                    self._read(os.path.join(dirpath, filename))
+
+    def _read(self, path: str) -> str:
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            with self._lock:
+                self._templates.pop(path, None)
+            raise FileNotFoundError(f"템플릿 파일이 없습니다: {path}")
+        with self._lock:
+            cached = self._templates.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        with self._lock:
+            self._templates[path] = (mtime, content)
+        return content
+
+    def get(self, template_name: str, template_dic: Optional[str] = None) -> str:
+        """템플릿 내용을 반환합니다. 파일이 바뀌었으면 다시 읽습니다."""
+        return self._read(self.get_path(template_name, template_dic))
+
+    def eligible_names(self) -> list:
+        """
+        random 템플릿 후보(루트 폴더의 파일 중 description 으로 시작하지 않는 파일)의 확장자 없는 이름 목록.
+        폴더에 파일이 추가/삭제되면 다시 조사합니다.
+        """
+        mtime = os.path.getmtime(self.root)
+        with self._lock:
+            if self._eligible is not None and self._eligible[0] == mtime:
+                return self._eligible[1]
+        names = []
+        for item_name in os.listdir(self.root):
+            item_path = os.path.join(self.root, item_name)
+            if os.path.isfile(item_path) and not item_name.lower().startswith('description'):
+                names.append(os.path.splitext(item_name)[0])
+        with self._lock:
+            self._eligible = (mtime, names)
+        return names
+
+    def choose_random(self) -> Optional[str]:
+        names = self.eligible_names()
+        if not names:
+            return None
+        return random.choice(names)
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_template_registry(root: str = 'templates') -> TemplateRegistry:
+    """디렉토리마다 하나의 TemplateRegistry 를 공유합니다. 처음 요청될 때 템플릿을 모두 미리 읽습니다."""
+    root = os.path.abspath(root)
+    with _registries_lock:
+        registry = _registries.get(root)
+        if registry is None:
+            registry = TemplateRegistry(root)
+            if os.path.isdir(root):
+                registry.preload()
+            _registries[root] = registry
+        return registry
@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+from keyword_export import KeywordExporter
+
+
+def make_result(n: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        '연관키워드': [f'키워드{i}' for i in range(n)],
+        '월간검색수_PC': [i * 10 for i in range(n)],
+        '월간검색수_모바일': [i * 20 for i in range(n)],
+        '문서수': [i * 3 for i in range(n)],
+    })
+
+
+def test_xlsx_round_trip_keeps_every_row(tmp_path):
+    pytest.importorskip('openpyxl')  # read_excel 로 다시 읽을 때 필요
+    first, second = make_result(5), make_result(3)
+    with KeywordExporter(str(tmp_path / 'result'), ['xlsx']) as exporter:
+        exporter.write('노트북', first)
+        exporter.write('마우스', second)
+
+    sheets = pd.read_excel(tmp_path / 'result.xlsx', sheet_name=None)
+    assert list(sheets) == ['노트북', '마우스']
+    pd.testing.assert_frame_equal(sheets['노트북'], first)
+    pd.testing.assert_frame_equal(sheets['마우스'], second)
+
+
+def test_csv_round_trip_appends_each_keyword(tmp_path):
+    first, second = make_result(4), make_result(2)
+    with KeywordExporter(str(tmp_path / 'result'), ['csv']) as exporter:
+        exporter.write('노트북', first)
+        exporter.write('마우스', second)
+
+    result = pd.read_csv(tmp_path / 'result.csv', encoding='utf-8-sig')
+    expected = pd.concat([first.assign(검색어='노트북'), second.assign(검색어='마우스')], ignore_index=True)
+    pd.testing.assert_frame_equal(result, expected)
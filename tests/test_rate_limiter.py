@@ -0,0 +1,63 @@
+import pytest
+
+import rate_limiter
+
+
+def test_limited_reports_success():
+    host = 'limited-success.example.com'
+
+    @rate_limiter.limited(host)
+    def post():
+        return 'ok'
+
+    bucket = rate_limiter.rate_limiter.get_bucket(host)
+    bucket._healthy = rate_limiter.RECOVERY_AFTER - 1
+    before = bucket.rate
+    assert post() == 'ok'
+    assert bucket.rate > before
+
+
+def test_limited_ignores_ordinary_exceptions():
+    host = 'limited-error.example.com'
+
+    @rate_limiter.limited(host)
+    def post():
+        raise TimeoutError('element not found')
+
+    bucket = rate_limiter.rate_limiter.get_bucket(host)
+    before = bucket.rate
+    with pytest.raises(TimeoutError):
+        post()
+    assert bucket.rate == before
+
+
+def test_limited_backs_off_on_rate_limited_error():
+    host = 'limited-throttled.example.com'
+
+    @rate_limiter.limited(host)
+    def post():
+        raise rate_limiter.RateLimitedError('too many posts')
+
+    bucket = rate_limiter.rate_limiter.get_bucket(host)
+    before = bucket.rate
+    with pytest.raises(rate_limiter.RateLimitedError):
+        post()
+    assert bucket.rate == before * rate_limiter.BACKOFF_FACTOR
+
+
+@pytest.mark.parametrize('rate', [0, -1.0, float('nan')])
+def test_configure_ignores_non_positive_rate(rate):
+    host = f'configure-invalid-{rate}.example.com'
+    bucket = rate_limiter.rate_limiter.get_bucket(host)
+    before = (bucket.rate, bucket.min_rate, bucket.max_rate)
+    rate_limiter.configure(host, rate)
+    assert (bucket.rate, bucket.min_rate, bucket.max_rate) == before
+    assert rate_limiter.wait(host) >= 0
+
+
+def test_configure_sets_rate():
+    host = 'configure-valid.example.com'
+    rate_limiter.configure(host, 3.0)
+    bucket = rate_limiter.rate_limiter.get_bucket(host)
+    assert bucket.rate == bucket.initial_rate == bucket.max_rate == 3.0
+    assert bucket.burst == 3
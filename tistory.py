@@ -1,11 +1,9 @@
 import datetime
-import dotenv
 import os
 import time
 import re
 import sys
 import random
-import chromedriver_autoinstaller
 import pyperclip
 import logging
 import requests
@@ -15,6 +13,13 @@ import string
 import undetected_chromedriver as uc
 from rapidfuzz import fuzz
 from openAI import OpenAIWrapper
+from driver_pool import DriverPool
+from browser_profile import get_browser_profile
+from coupang_partners import CoupangPartnersClient
+from coupang_reviews import fetch_reviews, parse_review
+from template_registry import get_template_registry
+import rate_limiter
+from settings import get_settings
 from keyword_generator import KeywordGenerator
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -25,30 +30,37 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException,
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
 from pyshorteners.shorteners import tinyurl
+from typing import Optional
 
 
 
 class Tistory:
     def __init__(self, gui):
-        self.COUPANG_USERNAME = dotenv.get_key('.env','COUPANG_USERNAME')
-        self.COUPANG_PASSWORD = dotenv.get_key('.env','COUPANG_PASSWORD')
-        self.use_coupang_link_config = dotenv.get_key('tistory.env', 'USE_MY_COUPANG_LINKS') == 'True' # 쿠팡 링크 세팅 파일을 사용하는지.. 
-        self.USE_COUPANG_IMAGE = dotenv.get_key('tistory.env','USE_COUPANG_IMAGE') == 'True'
-        self.USE_COUPANG_REVIEW = dotenv.get_key('tistory.env','USE_COUPANG_REVIEW') == 'True'
-        self.USE_COUPANG_AI_REVIEW = dotenv.get_key('tistory.env','USE_COUPANG_AI_REVIEW') == 'True'
-        self.USE_COUPANG_AI_GUIDE = dotenv.get_key('tistory.env','USE_COUPANG_AI_GUIDE') == 'True'
-        self.TEMPLATE_NAME = dotenv.get_key('tistory.env','TEMPLATE_NAME')
-        self.USE_ROCKET_SHIPPING = dotenv.get_key('tistory.env', 'USE_ROCKET_SHIPPING')
-        self.USE_EXACT_SEARCH_MATCHING = dotenv.get_key('tistory.env', 'USE_EXACT_SEARCH_MATCHING')
-        self.COUPANG_PRODUCT_LIMIT = dotenv.get_key('tistory.env','COUPANG_PRODUCT_LIMIT')
-        self.USE_CUSTOM_TITLE_BANNER = dotenv.get_key('tistory.env', 'USE_CUSTOM_TITLE_BANNER')
-        self.TITLE_BANNER_TEMPLATE_NAME = dotenv.get_key('tistory.env', 'TITLE_BANNER_TEMPLATE_NAME')
-        self.USE_GPT_IMAGE_CREATION =  dotenv.get_key('tistory.env','USE_GPT_IMAGE_CREATION')
-        self.USE_GPT_POST_TITLE = dotenv.get_key('tistory.env','USE_GPT_POST_TITLE')
-        self.USE_GPT_POST_DESCRIPTION = dotenv.get_key('tistory.env','USE_GPT_POST_DESCRIPTION')
-        self.USE_SHORT_URL = dotenv.get_key('.env','USE_SHORT_URL')
-        self.BANNED_WORDS = dotenv.get_key('.env', 'BANNED_WORDS')
-        self.KEEP_COUPANG_LOGIN = dotenv.get_key('.env', 'KEEP_COUPANG_LOGIN')
+        config = get_settings() # 설정 파일은 한 번만 읽은 스냅샷을 사용
+        self.COUPANG_USERNAME = config.get('.env','COUPANG_USERNAME')
+        self.COUPANG_PASSWORD = config.get('.env','COUPANG_PASSWORD')
+        self.use_coupang_link_config = config.get_bool('tistory.env', 'USE_MY_COUPANG_LINKS') # 쿠팡 링크 세팅 파일을 사용하는지.. 
+        self.USE_COUPANG_IMAGE = config.get_bool('tistory.env', 'USE_COUPANG_IMAGE')
+        self.USE_COUPANG_REVIEW = config.get_bool('tistory.env', 'USE_COUPANG_REVIEW')
+        self.USE_COUPANG_AI_REVIEW = config.get_bool('tistory.env', 'USE_COUPANG_AI_REVIEW')
+        self.USE_COUPANG_AI_GUIDE = config.get_bool('tistory.env', 'USE_COUPANG_AI_GUIDE')
+        self.TEMPLATE_NAME = config.get('tistory.env','TEMPLATE_NAME')
+        self.USE_ROCKET_SHIPPING = config.get('tistory.env', 'USE_ROCKET_SHIPPING')
+        self.USE_EXACT_SEARCH_MATCHING = config.get('tistory.env', 'USE_EXACT_SEARCH_MATCHING')
+        self.COUPANG_PRODUCT_LIMIT = config.get('tistory.env','COUPANG_PRODUCT_LIMIT')
+        self.USE_CUSTOM_TITLE_BANNER = config.get('tistory.env', 'USE_CUSTOM_TITLE_BANNER')
+        self.TITLE_BANNER_TEMPLATE_NAME = config.get('tistory.env', 'TITLE_BANNER_TEMPLATE_NAME')
+        self.USE_GPT_IMAGE_CREATION =  config.get('tistory.env','USE_GPT_IMAGE_CREATION')
+        self.USE_GPT_POST_TITLE = config.get('tistory.env','USE_GPT_POST_TITLE')
+        self.USE_GPT_POST_DESCRIPTION = config.get('tistory.env','USE_GPT_POST_DESCRIPTION')
+        # GPT 소개 문구/가이드/제목을 JSON 응답 한 번으로 작성
+        self.USE_GPT_COMBINED_COPY = config.get_bool('tistory.env', 'USE_GPT_COMBINED_COPY', True)
+        self.USE_SHORT_URL = config.get('.env','USE_SHORT_URL')
+        self.BANNED_WORDS = config.get('.env', 'BANNED_WORDS')
+        self.KEEP_COUPANG_LOGIN = config.get('.env', 'KEEP_COUPANG_LOGIN')
+        self.COUPANG_LINK_CONCURRENCY = config.get_int('.env', 'COUPANG_LINK_CONCURRENCY', 4)
+        self.COUPANG_REVIEW_CONCURRENCY = config.get_int('.env', 'COUPANG_REVIEW_CONCURRENCY', 3)
+        self.COUPANG_REVIEW_DELAY = config.get_float('.env', 'COUPANG_REVIEW_DELAY', 0.5)
          # MenuGUI 인스턴스를 저장
         self.gui = gui
         # GUI로부터 필요한 설정 값 가져오기
@@ -63,6 +75,8 @@ class Tistory:
         self.multiple_post = False
         self.is_random = False
         self.search_fail = []
+        self.coupang_sessions = set() # 쿠팡 로그인이 끝난 드라이버 session_id
+        self.partners_clients = {} # 드라이버 session_id 별 쿠팡 파트너스 API 클라이언트
         if self.TEMPLATE_NAME == 'random':
             self.is_random = True
         if self.USE_COUPANG_AI_REVIEW or self.USE_COUPANG_AI_GUIDE:
@@ -99,8 +113,6 @@ class Tistory:
             str or None: 랜덤하게 선택된 템플릿 파일의 내용. 
                         조건에 맞는 파일이 없거나 오류 발생 시 None 반환.
         """
-        eligible_filenames = [] # 이제 파일 이름을 저장합니다.
-    
         try:
             # 1. 기준 경로 가져오기
             base_path = self.get_base_path()
@@ -113,51 +125,34 @@ class Tistory:
                 print(f"      (.exe 파일과 같은 위치에 '{templates_dir_name}' 폴더가 있는지 확인하세요.)", file=sys.stderr)
                 return None
 
-            # templates 디렉토리 내의 모든 항목 이름 리스트 가져오기
-            for item_name in os.listdir(templates_full_path):
-                item_path = os.path.join(templates_full_path, item_name)
-
-                # 1. 파일인지 확인
-                # 2. 이름이 'description'으로 시작하지 않는지 확인
-                if os.path.isfile(item_path) and not item_name.lower().startswith('description'):
-                    # 조건을 만족하는 *파일 이름*을 리스트에 추가
-                    eligible_filenames.append(item_name) 
-
-            if not eligible_filenames:
+            # 후보 목록은 템플릿 저장소에 캐시되어 폴더가 바뀔 때만 다시 조사
+            template_name = get_template_registry(templates_full_path).choose_random()
+            if template_name is None:
                 print(f"경고: '{templates_full_path}' 디렉토리에서 로드할 수 있는 템플릿 파일을 찾지 못했습니다.", file=sys.stderr)
                 print(f"(description으로 시작하지 않고, 하위 폴더에 있지 않은 파일)", file=sys.stderr)
                 return None
 
-            # 조건을 만족하는 파일 리스트 중에서 무작위로 하나 선택
-            random_template_filename = random.choice(eligible_filenames)
-            print(f"선택된 템플릿 파일명 (확장자 포함): {random_template_filename}") # 디버깅용
-
-             # 파일 이름에서 확장자 제거
-            template_name_without_extension = os.path.splitext(random_template_filename)[0]
-            
+            print(f"선택된 템플릿 파일명: {template_name}") # 디버깅용
             # 확장자 없는 파일 이름 반환
-            return template_name_without_extension
+            return template_name
 
         except Exception as e:
             print(f"템플릿 로드 중 오류 발생: {e}", file=sys.stderr)
             return None
     def load_template(self, template_name, template_dic=None) -> str:
-        """HTML 템플릿 파일을 로드합니다."""
-        if template_dic is None:
-            template_path = os.path.join('templates', f"{template_name}.html")
-        else:
-            template_path = os.path.join('templates',template_dic,f"{template_name}.html")
-
-        if not os.path.exists(template_path):
-            raise FileNotFoundError(f"템플릿 파일이 없습니다: {template_path}")
-
-        with open(template_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        """HTML 템플릿을 로드합니다. 메모리에 캐시된 내용을 사용하며 파일이 바뀌면 다시 읽습니다."""
+        return get_template_registry('templates').get(template_name, template_dic)
     
    
     def get_banner_template(self, description, forReview):
         banner_html = f"""<div class='review-wrap' style='display: flex;flex-wrap:wrap;'>"""
         banner_html = description + banner_html
+        if self.USE_COUPANG_REVIEW and self.USE_COUPANG_AI_REVIEW:
+            # GPT 리뷰 요약은 배너를 만들기 전에 한 번에 동시 요청
+            targets = [pd for pd in forReview if pd.get('review_article')]
+            summaries = self.openai.get_gpt_summaries([pd['review_article'] for pd in targets])
+            for pd, summary in zip(targets, summaries):
+                pd['review_summary'] = summary
         i = 1
         for index, pd in enumerate(forReview):
             # 리뷰 내용이 없는 것은 제외..
@@ -198,8 +193,8 @@ class Tistory:
             # 리뷰 사용 여부 결정
             if self.USE_COUPANG_REVIEW and pd['review_article']:
                 if self.USE_COUPANG_AI_REVIEW:
-                    # GPT 기반 요약을 생성
-                    review_content = self.openai.get_gpt_summary(pd['review_article'])
+                    # 미리 생성해 둔 GPT 요약을 사용
+                    review_content = pd.get('review_summary', '')
                 else:
                     review_content = pd['review_article']
             else:
@@ -236,13 +231,12 @@ class Tistory:
                 rating_container=rating_container, rating_message=rating_message, review_content=review_content
             )  
             i += 1
-            time.sleep(1)
         banner_html += "</div><div style='color:#a9a9a9'>이 포스팅은 쿠팡 파트너스 활동의 일환으로, 이에 따른 일정액의 수수료를 제공받습니다.</div>"  
         return banner_html
     
                   
     
-    def get_naver_shopping_trends(self, driver: webdriver.Chrome, search_keyword: str | None = None) -> list:
+    def get_naver_shopping_trends(self, driver: webdriver.Chrome, search_keyword: Optional[str] = None) -> list:
         '''
         이 함수는 기본적으로 네이버 베스트 쇼핑 키워드와 datalab의 카테고리별 인기 검색 키워드를 자동으로 가져오는 함수입니다. 아래 코드중 naver_shopping_list 에 넣는 키워드를 아래와 같이 양식만 맞추어 배열에 넣어준다면, 수동으로 작성하는 것도 가능합니다. 
             
@@ -378,294 +372,159 @@ class Tistory:
             print('페이지의 HTML 구조가 변경 된 것 같습니다. 확인이 필요합니다.')
             exit(1)
             
-    def get_coupang_partners(self, driver: webdriver.Chrome, naver_shopping_list: list | None = None, manual_keyword: str | None = None) -> list:
+    def prepare_coupang_session(self, driver: webdriver.Chrome):
+        '''
+        쿠팡 파트너스에 로그인하거나 저장된 로그인 쿠키를 불러옵니다. 드라이버 세션마다 한 번만 실행하면 됩니다.
+        '''
+        cookie_file_path = f"cookies_coupang.pkl"
+        if self.KEEP_COUPANG_LOGIN == 'True' and os.path.exists(cookie_file_path):
+            print('쿠팡 로그인 유지 옵션 ON')
+            driver.get('https://login.coupang.com/login/login.pang')
+            # 쿠키 파일이 존재하면 쿠키를 로드
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": """ Object.defineProperty(navigator, 'webdriver', { get: () => undefined }) """})
+            cookies = pickle.load(open(cookie_file_path, "rb"))
+            for cookie in cookies:
+                driver.add_cookie(cookie)
+            print(f'쿠팡 로그인 쿠키 로드 (파일: {cookie_file_path})')
+            driver.get('https://partners.coupang.com/')
+            time.sleep(1)
+            driver.refresh()
+        else:
+            self.coupang_login(driver)
+            time.sleep(1)
+            pickle.dump(driver.get_cookies(), open(cookie_file_path, "wb"))
+            print(f'쿠팡 로그인 쿠키 저장 (파일: {cookie_file_path})')
+        # 파트너스 검색창이 보이면 로그인 완료
+        WebDriverWait(driver, 10).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, '.ant-input.ant-input-lg'))
+        )
+        self.coupang_sessions.add(driver.session_id)
+
+    def ensure_coupang_session(self, driver: webdriver.Chrome):
+        '''
+        드라이버 풀에서 재사용 중인 브라우저는 이미 로그인되어 있으므로 로그인을 건너뜁니다.
+        '''
+        if driver.session_id not in self.coupang_sessions:
+            self.prepare_coupang_session(driver)
+
+    def get_partners_client(self, driver: webdriver.Chrome) -> CoupangPartnersClient:
+        '''
+        로그인된 브라우저의 쿠키로 쿠팡 파트너스 API 클라이언트를 만듭니다.
+        같은 브라우저 세션에서는 처음 만든 클라이언트(와 연결)를 계속 재사용합니다.
+        '''
+        self.ensure_coupang_session(driver)
+        client = self.partners_clients.get(driver.session_id)
+        if client is None:
+            client = CoupangPartnersClient.from_driver(driver, self.selected_ch_id, self.KEEP_COUPANG_LOGIN == 'True')
+            self.partners_clients[driver.session_id] = client
+        return client
+
+    def close_partners_clients(self):
+        '''
+        재사용하던 쿠팡 파트너스 API 클라이언트의 연결을 모두 닫습니다.
+        '''
+        for client in self.partners_clients.values():
+            client.close()
+        self.partners_clients.clear()
+
+    def get_link_concurrency(self) -> int:
+        '''
+        쿠팡 파트너스 링크 동시 생성 수. 설정값이 없거나 잘못되면 4.
+        '''
+        return max(1, self.COUPANG_LINK_CONCURRENCY)
+
+    def make_product_detail(self, search_data: dict, url_data: dict, search_keyword: str) -> Optional[dict]:
+        '''
+        검색 결과와 링크 생성 결과로 포스팅에 사용할 상품 정보를 만듭니다. 링크가 없으면 None.
+        '''
+        if not (url_data['data'] and url_data['data']['shortUrl']):
+            return None
+        product_detail = {
+            "thumbnail": search_data['image'].replace('212x212', '500x500'),
+            "name": search_data['title'],
+            "url": url_data['data']['shortUrl'],
+            "search_keyword": search_keyword,
+            "itemId": search_data['itemId'],
+            "productId": search_data['productId'],
+            "vendorItemId": search_data['vendorItemId'],
+            "originPrice": search_data['originPrice'],
+            "salesPrice": search_data['salesPrice']
+        }
+        print('현재 제품:'+ product_detail['name']+ '\n' + '링크:' + product_detail['url'])
+        return product_detail
+
+    def get_coupang_partners(self, driver: webdriver.Chrome, naver_shopping_list: Optional[list] = None, manual_keyword: Optional[str] = None) -> list:
         '''
         쿠팡 파트너의 상품을 네이버 인기 쇼핑 키워드를 사용하거나 수동으로 입력받은 키워드를 사용하여 검색합니다. 
         '''
         product_details = []
-        user_agent = driver.execute_script("return navigator.userAgent;")
-          # 검색 페이지 
-        if self.USE_ROCKET_SHIPPING == 'True':
-            rocket = '"ROCKET"'
-        else:
-            rocket = ''
-        cookie_file_path = f"cookies_coupang.pkl"
+        rocket = self.USE_ROCKET_SHIPPING == 'True'
         if naver_shopping_list is not None and len(naver_shopping_list) > 0:
-            if self.KEEP_COUPANG_LOGIN == 'True' and os.path.exists(cookie_file_path):
-                print('쿠팡 로그인 유지 옵션 ON')
-                driver.get('https://login.coupang.com/login/login.pang')
-                # 쿠키 파일이 존재하면 쿠키를 로드
-                driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": """ Object.defineProperty(navigator, 'webdriver', { get: () => undefined }) """})
-                cookies = pickle.load(open(cookie_file_path, "rb"))
-                for cookie in cookies:
-                    driver.add_cookie(cookie)
-                print(f'쿠팡 로그인 쿠키 로드 (파일: {cookie_file_path})')
-                driver.get('https://partners.coupang.com/')
-                time.sleep(1)
-                driver.refresh()
-               
-            else:
-                self.coupang_login(driver)
-                time.sleep(1)  
-                pickle.dump(driver.get_cookies(), open(cookie_file_path, "wb"))
-                print(f'쿠팡 로그인 쿠키 저장 (파일: {cookie_file_path})')
+            client = self.get_partners_client(driver)
+            # 금지어 리스트로 분리
+            banned_words = [word.strip() for word in self.BANNED_WORDS.split(',')]
             # 네이버 쇼핑 키워드를 기반으로 상품 정보를 검색
             for product_info in naver_shopping_list:
-                driver.implicitly_wait(3) 
-                # 쿠팡 파트너스의 검색창을 찾음
-                search_input = WebDriverWait(driver,10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, '.ant-input.ant-input-lg'))
-                )
-             
-                # 상품을 우선 가져온다
-                search_script = f"""
-                    return await fetch('https://partners.coupang.com/api/v1/search', {{
-                        method: 'POST', 
-                        headers: {{
-                            'User-Agent': '{user_agent}',
-                            'Accept':'application/json',
-                            'Content-Type':'application/json;charset=UTF-8'
-                        }},
-                        body: JSON.stringify({{
-                            "page": {{"pageNumber":0, "size":72}},
-                            "filter": "{product_info['name']}",
-                            "deliveryTypes": [{rocket}] 
-                        }})
-                    }}).then(r => r.json());
-                """
-                json_search_data = driver.execute_script(search_script)
-                x_token = None
-                cookies = driver.get_cookies()
-                x_token = next((cookie['value'] for cookie in cookies if cookie['name'] == 'AFATK'), None)
-                if x_token:
-                    with open('cookies_x_token.pkl', 'wb') as f:
-                        pickle.dump(x_token, f)
-                else:
-                    if self.KEEP_COUPANG_LOGIN == 'True' and os.path.exists('cookies_x_token.pkl'):
-                        with open('cookies_x_token.pkl', 'rb') as f:
-                            x_token = pickle.load(f)
-                            cookie = {}
-                            cookie['name'] = 'AFATK'
-                            cookie['value'] = x_token
-                            cookie['domain'] = '.coupang.com'
-                            cookie['path'] = '/'
-                            cookie['expires'] = 0
-                            driver.add_cookie(cookie)
-                    else:
-                        print('xtoken 없음')
-        
                 print('상품 검색중...')
-            
+                json_search_data = client.search(product_info['name'], rocket)
                 if json_search_data['data'] and json_search_data['data']['products']:
                     i = 0
                     for search_data in json_search_data['data']['products']:
                         if i == 1:
                             break
-                        # 금지어 리스트로 분리
-                        banned_words = [word.strip() for word in self.BANNED_WORDS.split(',')]
                         if self.USE_EXACT_SEARCH_MATCHING == 'True':
                             thresold = fuzz.partial_ratio(product_info['name'], search_data['title'])
                             if thresold < 65:
                                 continue
                         if any(banned_word in product_info['name'] for banned_word in banned_words):
                             continue
-                        itemId = search_data['itemId']
-                        productId = search_data['productId']
-                        vendorItemId = search_data['vendorItemId']
-                        image = search_data['image']
-                        title = search_data['title']
-                        # discountRate = search_data['discountRate']
-                        originPrice = search_data['originPrice']
-                        salesPrice = search_data['salesPrice']
-                
-                        url_script = f"""
-                            return fetch('https://partners.coupang.com/api/v1/banner/iframe/url', {{
-                                method: 'POST',
-                                headers: {{
-                                    'Accept': 'application/json',
-                                    'Content-Type': 'application/json;charset=UTF-8',
-                                    'X-Token': '{x_token}',
-                                    'X-Sub-Id': '{self.selected_ch_id}'
-                                }},
-                                body: JSON.stringify({{
-                                    "product": {{
-                                        "type": "PRODUCT",
-                                        "itemId": {itemId},
-                                        "productId": {productId},
-                                        "vendorItemId": {vendorItemId},
-                                        "image": "{image}",
-                                        "title": "{title}",
-                                        "originPrice": {originPrice},
-                                        "salesPrice": {salesPrice}
-                                    }}
-                                }})
-                            }}).then(r => r.json());
-                            """
-                        url_data = driver.execute_script(url_script)
-                        if url_data['data'] and url_data['data']['shortUrl']:
-                            product_detail = {
-                                "thumbnail": image.replace('212x212','500x500'), 
-                                "name": title,
-                                "url": url_data['data']['shortUrl'],
-                                "search_keyword": product_info['name'],
-                                "itemId": itemId,
-                                "productId": productId,
-                                "vendorItemId": vendorItemId,
-                                "originPrice": originPrice,
-                                "salesPrice": salesPrice
-                            }
-                            print('현재 제품:'+ product_detail['name']+ '\n' + '링크:' + product_detail['url'])
+                        url_data = client.create_link(search_data)
+                        product_detail = self.make_product_detail(search_data, url_data, product_info['name'])
+                        if product_detail is not None:
                             product_details.append(product_detail)
-                            time.sleep(1)
                         i += 1
             return product_details
         elif manual_keyword is not None:
-            if self.KEEP_COUPANG_LOGIN == 'True' and os.path.exists(cookie_file_path):
-                print('쿠팡 로그인 유지 ON')
-                driver.get('https://login.coupang.com/login/login.pang')
-                # 쿠키 파일이 존재하면 쿠키를 로드
-                driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": """ Object.defineProperty(navigator, 'webdriver', { get: () => undefined }) """})
-                cookies = pickle.load(open(cookie_file_path, "rb"))
-                for cookie in cookies:
-                    driver.add_cookie(cookie)
-                print(f'쿠팡 로그인 쿠키 로드 (파일: {cookie_file_path})')
-                driver.get('https://partners.coupang.com/')
-                time.sleep(1)
-                driver.refresh()
-               
-            else:
-                self.coupang_login(driver)
-                time.sleep(1) 
-                pickle.dump(driver.get_cookies(), open(cookie_file_path, "wb"))
-                print(f'쿠팡 로그인 쿠키 저장 (파일: {cookie_file_path})')
-         
+            client = self.get_partners_client(driver)
             try:
-                # 쿠팡 파트너스의 검색창을 찾음
-                search_input = WebDriverWait(driver,10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, '.ant-input.ant-input-lg'))
-                )
-                search_script = f"""
-                    return await fetch('https://partners.coupang.com/api/v1/search', {{
-                        method: 'POST', 
-                        headers: {{
-                            'User-Agent': '{user_agent}',
-                            'Accept':'application/json',
-                            'Content-Type':'application/json;charset=UTF-8'
-                        }},
-                        body: JSON.stringify({{
-                            "page": {{"pageNumber":0, "size":72}},
-                            "filter": "{manual_keyword}",
-                            "deliveryTypes": [{rocket}]
-                        }})
-                    }}).then(r => r.json());
-                """
-                json_search_data = driver.execute_script(search_script)
-                x_token = None
-                cookies = driver.get_cookies()
-                x_token = next((cookie['value'] for cookie in cookies if cookie['name'] == 'AFATK'), None)
-                if x_token:
-                    with open('cookies_x_token.pkl', 'wb') as f:
-                        pickle.dump(x_token, f)
-                else:
-                    if self.KEEP_COUPANG_LOGIN == 'True' and os.path.exists('cookies_x_token.pkl'):
-                        with open('cookies_x_token.pkl', 'rb') as f:
-                            x_token = pickle.load(f)
-                            cookie = {}
-                            cookie['name'] = 'AFATK'
-                            cookie['value'] = x_token
-                            cookie['domain'] = '.coupang.com'
-                            cookie['path'] = '/'
-                            cookie['expires'] = 0
-                            driver.add_cookie(cookie)
-                            print('xtoken 쿠키 생성 완료')
-                    else:
-                        print('xtoken 없음')
                 print('상품 검색중...')
+                json_search_data = client.search(manual_keyword, rocket)
                 product_limit = int(self.COUPANG_PRODUCT_LIMIT)
                 if json_search_data['data'] and json_search_data['data']['products']:
-                    i = 0
+                    # 링크를 만들 상품을 먼저 고른 뒤 한꺼번에 링크를 생성
+                    candidates = []
                     for search_data in json_search_data['data']['products']:
-                        print(search_data)
                         if self.USE_EXACT_SEARCH_MATCHING == 'True':
                             thresold = fuzz.partial_ratio(manual_keyword, search_data['title'])
                             if thresold < 65:
                                 continue 
-                        if (i == product_limit and self.use_coupang_link_config is False):
+                        if (len(candidates) == product_limit and self.use_coupang_link_config is False):
                             break
-                        itemId = search_data['itemId']
-                        productId = search_data['productId']
-                        vendorItemId = search_data['vendorItemId']
-                        image = search_data['image']
-                        title = search_data['title']
-                        # discountRate = search_data['discountRate']
-                        originPrice = search_data['originPrice']
-                        salesPrice = search_data['salesPrice']
-                
-                        url_script = f"""
-                            return fetch('https://partners.coupang.com/api/v1/banner/iframe/url', {{
-                                method: 'POST',
-                                headers: {{
-                                    'Accept': 'application/json',
-                                    'Content-Type': 'application/json;charset=UTF-8',
-                                    'X-Token': '{x_token}',
-                                    'X-Sub-Id': '{self.selected_ch_id}'
-                                }},
-                                body: JSON.stringify({{
-                                    "product": {{
-                                        "type": "PRODUCT",
-                                        "itemId": {itemId},
-                                        "productId": {productId},
-                                        "vendorItemId": {vendorItemId},
-                                        "image": "{image}",
-                                        "title": "{title}",
-                                        "originPrice": {originPrice},
-                                        "salesPrice": {salesPrice}
-                                    }}
-                                }})
-                            }}).then(r => r.json());
-                            """
-                        print('상품 링크 생성중..')
-                        url_data = driver.execute_script(url_script)
-                        if url_data['data'] and url_data['data']['shortUrl']:
-                            product_detail = {
-                                "thumbnail": image.replace('212x212', '500x500'), 
-                                "name": title,
-                                "url": url_data['data']['shortUrl'],
-                                "search_keyword": title.replace(',', '-'),
-                                "itemId": itemId,
-                                "productId": productId,
-                                "vendorItemId": vendorItemId,
-                                "originPrice": originPrice,
-                                "salesPrice": salesPrice
-                            }
-                            print('현재 제품:'+ product_detail['name']+ '\n' + '링크:' + product_detail['url'])
+                        candidates.append(search_data)
+                    print(f'상품 링크 생성중.. ({len(candidates)}개)')
+                    results = client.create_links(candidates, self.get_link_concurrency())
+                    for search_data, (url_data, error) in zip(candidates, results):
+                        if error is not None:
+                            continue
+                        product_detail = self.make_product_detail(search_data, url_data, search_data['title'].replace(',', '-'))
+                        if product_detail is not None:
                             product_details.append(product_detail)
-                            
-                            time.sleep(1)
-                        i += 1
                 
             except Exception as e:
                 print("에러: " + str(e))    
-            # cookies = driver.get_cookies()  # 모든 쿠키 가져오기
-
-            # for cookie in cookies:
-            #     if "coupang" in cookie['domain']:  # 특정 도메인의 쿠키만 삭제
-            #         driver.delete_cookie(cookie['name'])  
 
             return product_details
         
         
         else:
             raise Exception('네이버 데이터 없음')
-    def get_coupang_reviews(self, driver, product_id, vendor_item_id):
-        url_script = f"""
-            return fetch("https://www.coupang.com/vm/products/{product_id}/brand-sdp/reviews/list?vendorItemId={vendor_item_id}", {{
-                method: "GET"
-            }}).then(response => response.json());
-        """
-        print("쿠팡 리뷰 데이터 요청 중..브라우저를 끄지 마세요.")
-        reviews_data = driver.execute_script(url_script)
-        return reviews_data
+    def get_coupang_reviews(self, driver, products: list) -> list:
+        '''
+        (productId, vendorItemId) 목록의 리뷰를 동시에 요청해 리뷰 수, 평점, 상위 리뷰를 products 순서대로 반환합니다.
+        '''
+        print(f"쿠팡 리뷰 데이터 요청 중..브라우저를 끄지 마세요. ({len(products)}개)")
+        results = fetch_reviews(driver, products, self.COUPANG_REVIEW_CONCURRENCY, self.COUPANG_REVIEW_DELAY)
+        return [parse_review(result) for result in results]
     '''
     쿠팡에서 위의 쿠팡파트너스 url로 각 제품의 리뷰 정보를 가져옴
     '''
@@ -673,7 +532,7 @@ class Tistory:
         driver.get('https://www.coupang.com/vm/products/8391705721/')
         forReview = []
         total_keywords = []
-       
+        review_targets = []
         if use_links == True:
             if os.path.exists(os.getcwd().replace('\\', '/') + '/product_links.json'):
                         # 파일이 존재할 경우 처리
@@ -685,8 +544,8 @@ class Tistory:
                     print('product_links.json 파일안의 데이터가 옳바르지 않습니다.')
                     raise Exception('product_links.json invalid data')
                 for link in product_links:
+                    rate_limiter.wait('www.coupang.com')
                     driver.get(link.split('?')[0])
-                    time.sleep(3)
                     coupang_product = {}
                     WebDriverWait(driver, 10).until(
                         lambda d: d.execute_script("return typeof window.sdp !== 'undefined'")
@@ -717,30 +576,17 @@ class Tistory:
                         coupang_product['origin_price'] = origin_price
                         coupang_product['sale_price'] = sale_price
                         print(f"Product ID: {product_id}, Vendor Item ID: {vendor_item_id}")
-                        print('리뷰 가져오는중..')
-                        review = self.get_coupang_reviews(driver, product_id, vendor_item_id)
-                        review_arr = []
-                        count = review['ratingCount']
-                        rating = review['ratingAverage']
-                        if review['reviews'] and len(review['reviews']) > 0:
-                            i = 0
-                            for rv in review['reviews']:
-                                if rv['content']:
-                                    i += 1
-                                    review_arr.append(rv['content'])
-                                    if i == 3:
-                                        break
-                                    
-                        coupang_product['count'] = count
-                        coupang_product['rating'] = rating
-                        coupang_product['review_article'] = ' '.join(review_arr)       
+                        # 리뷰는 모든 링크를 확인한 뒤 한 번에 가져옴
+                        review_targets.append((coupang_product, (product_id, vendor_item_id)))
                         if name not in total_keywords:
                             total_keywords.append(name) 
                     else:
                         print("sdp 데이터가 존재하지 않습니다.")
                       
                     forReview.append(coupang_product)
-                    time.sleep(3)
+                reviews = self.get_coupang_reviews(driver, [ids for _, ids in review_targets])
+                for (coupang_product, _), review in zip(review_targets, reviews):
+                    coupang_product.update(review)
                 return (forReview, total_keywords)
             else:
                 print('product_links.json 파일이 존재하지 않습니다.')
@@ -748,22 +594,9 @@ class Tistory:
         elif len(product_details) > 0:
         
             
-            for coupang_product in product_details:
-                time.sleep(random.uniform(1, 3))
-                print('리뷰 가져오는중..')
-                review = self.get_coupang_reviews(driver, coupang_product['productId'], coupang_product['vendorItemId'])
-                review_arr = []
-                count = review['ratingCount']
-                rating = review['ratingAverage']
-                if review['reviews'] and len(review['reviews']) > 0:
-                    i = 0
-                    for rv in review['reviews']:
-                        if rv['content']:
-                            i += 1
-                            review_arr.append(rv['content'])
-                            if i == 3:
-                                break
-                
+            print('리뷰 가져오는중..')
+            reviews = self.get_coupang_reviews(driver, [(p['productId'], p['vendorItemId']) for p in product_details])
+            for coupang_product, review in zip(product_details, reviews):
                 #네이버 쇼핑 트렌드 현재 검색어 출력..
                 print(coupang_product['search_keyword'])
                 if coupang_product['search_keyword'] not in total_keywords:
@@ -782,17 +615,16 @@ class Tistory:
                
 
 
-                coupang_product['count'] = count
-                coupang_product['rating'] = rating
-                coupang_product['review_article'] = ' '.join(review_arr)
+                coupang_product.update(review)
                 forReview.append(coupang_product)
-                time.sleep(random.uniform(1, 3))
             return (forReview, total_keywords)
         
     '''
     쿠팡 파트너스 데이터로 티스토리 블로그 작성 
     '''    
-    def write_tistory_coupang(self, driver: webdriver.Chrome, forReview:list, total_keywords: list, keyword: None|str = None):
+    # 연속 포스팅 간격은 속도 제한기가 관리
+    @rate_limiter.limited('www.tistory.com')
+    def write_tistory_coupang(self, driver: webdriver.Chrome, forReview:list, total_keywords: list, keyword: Optional[str] = None):
         if len(forReview) > 0 and len(total_keywords) > 0:
             # 티스토리 로그인..
             self.tistory_login(driver)
@@ -802,37 +634,50 @@ class Tistory:
     '''
     쿠팡 파트너스 배너를 만들어 한번에 포스팅
     '''
-    def coupang_partners_group_posting(self, driver:webdriver.Chrome, forReview:list, total_keywords: list, keyword: None|str = None):
+    def coupang_partners_group_posting(self, driver:webdriver.Chrome, forReview:list, total_keywords: list, keyword: Optional[str] = None):
         today = datetime.date.today().strftime('%Y년 %m월 %d일')
         total_keywords_str = ', '.join(total_keywords)
         
+        # 제목에 들어갈 상품 수. GPT 문구를 한 번에 요청할 수 있도록 소개 문구보다 먼저 계산
+        i = 1
+        for index, pd in enumerate(forReview):
+            # 리뷰 내용이 없는 것은 제외..
+            if self.USE_COUPANG_REVIEW:
+                try:
+                    if not pd['review_article']:
+                        continue
+                except Exception as e:
+                    continue
+            nth = str(i)
+            i += 1
+
+        # GPT 로 작성하는 소개 문구/가이드/제목을 한 번의 요청으로 작성
+        post_copy = {}
+        if keyword is not None and self.use_naver is False and self.USE_GPT_COMBINED_COPY:
+            fields = [field for field, enabled in (
+                ('description', self.USE_GPT_POST_DESCRIPTION == 'True'),
+                ('guide', self.USE_COUPANG_AI_GUIDE),
+                ('title', self.USE_GPT_POST_TITLE == 'True'),
+            ) if enabled]
+            if len(fields) > 1:
+                post_copy = self.openai.get_post_copy(keyword, nth, fields)
+
         if keyword is not None:
             if self.use_naver is False:
                 if self.USE_GPT_POST_DESCRIPTION == 'True':
                     # GPT를 사용하여 제품 설명을 생성
-                    description = self.openai.get_product_description(keyword)
+                    description = post_copy['description'] if 'description' in post_copy else self.openai.get_product_description(keyword)
                     description += "<div style='color:#f29766;text-align:center;width:100%;'>이 포스팅은 쿠팡 파트너스 활동의 일환으로, 이에 따른 일정액의 수수료를 제공받습니다.</div>"
                 else:
                     description = self.load_template('description_coupang').format(keyword=keyword) 
                 if self.USE_COUPANG_AI_GUIDE:
-                    guide = self.openai.get_product_guide(keyword)
-                description += f"<div class='guide' style='margin-bottom:30px;text-align:center'><h2>제품 선택 가이드</h2><div style='width:100%;text-align:left'>{guide}</div>"
+                    guide = post_copy['guide'] if 'guide' in post_copy else self.openai.get_product_guide(keyword)
+                    description += f"<div class='guide' style='margin-bottom:30px;text-align:center'><h2>제품 선택 가이드</h2><div style='width:100%;text-align:left'>{guide}</div>"
             else:
                 description = self.load_template('description_naver_category').format(keyword=keyword, total_keywords_str=total_keywords_str)
         else:
             description = self.load_template('description_naver_total').format(today=today, total_keywords_str=total_keywords_str)
         
-        i = 1
-        for index, pd in enumerate(forReview):
-            # 리뷰 내용이 없는 것은 제외..
-            if self.USE_COUPANG_REVIEW:
-                try:
-                    if not pd['review_article']:
-                        continue
-                except Exception as e:
-                    continue
-            nth = str(i)
-            i += 1
         banner_html = self.get_banner_template(description, forReview)
         #글작성 버튼 클릭 함수        
         self.tistory_move_to_writebutton(driver)
@@ -889,7 +734,7 @@ class Tistory:
                 main_keyword = keyword
                 post_fix = random.choice(rand_post_fix).replace('{nth}', str(nth))
                 if self.USE_GPT_POST_TITLE == 'True':
-                    full_title = self.openai.get_post_title(keyword, nth)
+                    full_title = post_copy['title'] if 'title' in post_copy else self.openai.get_post_title(keyword, nth)
                 else:
                     full_title = " ".join([pre_fix, main_keyword, post_fix]).strip()
                     
@@ -988,13 +833,16 @@ class Tistory:
             time.sleep(1)
             # 임시 저장 버튼 클릭 
             driver.find_element(By.CSS_SELECTOR, '.btn-draft .action').click()
-            driver.close()
+            # 브라우저는 닫지 않고 드라이버 풀에 반환합니다. 임시 저장 요청이 끝날 때까지만 대기
+            time.sleep(1)
         
         
         
     '''
     GPT로 작성된 게시글을 첨부하는 함수입니다. GPT 는 현재 gpt asistant api를 사용하여 작성된 게시글을 생성하는 형태입니다. 
     '''    
+    # 연속 포스팅 간격은 속도 제한기가 관리
+    @rate_limiter.limited('www.tistory.com')
     def write_tistory_blog(self, driver: webdriver.Chrome, data:dict):
         if data is not None:
             self.tistory_login(driver)
@@ -1100,7 +948,8 @@ class Tistory:
                 time.sleep(1)
                 # 임시 저장 버튼 클릭 
                 driver.find_element(By.CSS_SELECTOR, '.btn-draft .action').click()
-                driver.close()
+                # 브라우저는 닫지 않고 드라이버 풀에 반환합니다. 임시 저장 요청이 끝날 때까지만 대기
+                time.sleep(1)
 
     def tistory_login(self, driver: webdriver.Chrome):
         driver.get('https://www.tistory.com/')
@@ -1209,7 +1058,7 @@ class Tistory:
     '''
     티스토리 작성을 시작합니다. 
     '''
-    def process_auto_tistory(self, mode:str|None = None):
+    def process_auto_tistory(self, mode:Optional[str] = None):
         keyword = None
         if self.gui.account_changed is True:
             cpath = f"cookies_{self.gui.pre_selected_id.replace(':', '_')}.pkl"
@@ -1245,11 +1094,15 @@ class Tistory:
             
             openAiWrapper = OpenAIWrapper()
             if self.multiple_post is True:
-                for keyword in keywords:
-                    print('다중 키워드 입력 작업중 현재 키워드:' + keyword)
-                    driver = self.setChromium()
-                    res = openAiWrapper.get_gpt_blog(keyword)
-                    self.write_tistory_blog(driver, res)
+                pool = self.create_driver_pool()
+                try:
+                    for keyword in keywords:
+                        print('다중 키워드 입력 작업중 현재 키워드:' + keyword)
+                        res = openAiWrapper.get_gpt_blog(keyword)
+                        with pool.lease() as driver:
+                            self.write_tistory_blog(driver, res)
+                finally:
+                    pool.close()
             else:
                 res = openAiWrapper.get_gpt_blog(keyword)
                 self.write_tistory_blog(driver, res)
@@ -1286,25 +1139,28 @@ class Tistory:
                 else:
                     naver_shopping_trends = None
                     if self.multiple_post is True:
-                        for keyword in keywords:
-                            print('다중 키워드 입력 작업중 현재 키워드:' + keyword)
-                            driver = self.setChromium()
-                            keyword = keyword.strip()
-                            product_details = self.get_coupang_partners(driver, naver_shopping_trends, keyword)
-                            print(product_details)
-                            try:
-                                (forReview, total_keywords) = self.get_coupang_products(driver, product_details)
-                            except TypeError as e:
-                                if 'cannot unpack non-iterable' in str(e):
-                                    print('검색 결과 없음: '+ keyword)
-                                    self.search_fail.append(keyword)
-                                    driver.close()
-                                    time.sleep(random.uniform(1, 3))
-                                    continue
-                            self.write_tistory_coupang(driver, forReview, total_keywords, keyword)
-                            if self.is_random:
-                                self.TEMPLATE_NAME = 'random'
-                            time.sleep(random.uniform(1, 3))
+                        # 키워드마다 브라우저를 새로 띄우지 않고 로그인된 브라우저를 빌려 씀
+                        pool = self.create_driver_pool(warmup=self.prepare_coupang_session)
+                        try:
+                            for keyword in keywords:
+                                print('다중 키워드 입력 작업중 현재 키워드:' + keyword)
+                                keyword = keyword.strip()
+                                with pool.lease() as driver:
+                                    product_details = self.get_coupang_partners(driver, naver_shopping_trends, keyword)
+                                    print(product_details)
+                                    try:
+                                        (forReview, total_keywords) = self.get_coupang_products(driver, product_details)
+                                    except TypeError as e:
+                                        if 'cannot unpack non-iterable' in str(e):
+                                            print('검색 결과 없음: '+ keyword)
+                                            self.search_fail.append(keyword)
+                                            continue
+                                    self.write_tistory_coupang(driver, forReview, total_keywords, keyword)
+                                if self.is_random:
+                                    self.TEMPLATE_NAME = 'random'
+                        finally:
+                            pool.close()
+                            self.close_partners_clients()
                         if len(self.search_fail) > 0:
                             print("검색 결과 조회 실패 검색어: "+', '.join(self.search_fail))
                         
@@ -1317,7 +1173,6 @@ class Tistory:
                             if 'cannot unpack non-iterable' in str(e):
                                 driver.close()
                                 raise Exception('검색 결과 없음: '+ keyword)
-                        time.sleep(random.uniform(1, 3))
                         self.write_tistory_coupang(driver, forReview, total_keywords, keyword)
         return True
     '''
@@ -1325,18 +1180,22 @@ class Tistory:
     '''
     def setChromium(self)->webdriver.Chrome:
         """Chrome 웹드라이버 설정"""
-        chrome_ver = chromedriver_autoinstaller.get_chrome_version().split('.')[0]
-        
+        # 크롬 버전/드라이버 경로/User-Agent 는 browser_profile.json 에 캐시된 값을 사용
+        profile = get_browser_profile()
         try:
-            fake_options = webdriver.ChromeOptions()
-            fake_driver = webdriver.Chrome(service=Service(os.getcwd().replace('\\', '/')+f'/driver/{chrome_ver}/chromedriver.exe'), options=fake_options)
-        except:
-            chromedriver_autoinstaller.install(False, os.getcwd().replace('\\', '/')+'/driver')
-            fake_options = webdriver.ChromeOptions()
-            fake_driver = webdriver.Chrome(service=Service(os.getcwd().replace('\\', '/')+f'/driver/{chrome_ver}/chromedriver.exe'), options=fake_options)
-        
-        user_agent = fake_driver.execute_script("return navigator.userAgent;")
-        fake_driver.close()
+            driver = webdriver.Chrome(service=Service(profile['driver_path']), options=self.get_chrome_options(profile))
+        except WebDriverException:
+            # 캐시된 드라이버 정보가 맞지 않으면 다시 조사 후 새 User-Agent 로 옵션을 다시 만들어 재시도
+            profile = get_browser_profile(force=True)
+            driver = webdriver.Chrome(service=Service(profile['driver_path']), options=self.get_chrome_options(profile))
+        driver.implicitly_wait(10)
+        driver.maximize_window()
+        return driver
+
+    def get_chrome_options(self, profile: dict) -> webdriver.ChromeOptions:
+        """browser_profile 의 크롬 버전/User-Agent 로 크롬 옵션을 만듭니다."""
+        chrome_ver = profile['chrome_major']
+        user_agent = profile['user_agent']
         
         options = webdriver.ChromeOptions()
         print(f'사용자 크롬 버전: {chrome_ver}, User-Agent: {user_agent}')
@@ -1361,14 +1220,16 @@ class Tistory:
        
         options.add_experimental_option("excludeSwitches", ["enable-automation"])
         options.add_experimental_option('useAutomationExtension', False)
-        
-        driver = webdriver.Chrome(service=Service(os.getcwd().replace('\\', '/')+f'/driver/{chrome_ver}/chromedriver.exe'), options=options)
-        driver.implicitly_wait(10)
-        driver.maximize_window()
-        return driver
+        return options
 
     def getUndetectedChrome(self):
         return uc.Chrome() 
+
+    def create_driver_pool(self, warmup=None) -> DriverPool:
+        '''다중 키워드 작업에서 키워드마다 빌려 쓸 브라우저 풀을 만듭니다.
+        키워드는 순서대로 하나씩 작성하므로 브라우저 하나를 띄워두고 계속 재사용합니다.'''
+        return DriverPool(self.setChromium, size=1, warmup=warmup)
+
     # 단축 url 을 생성하는 함수
     def short(self, url):
         return tinyurl.Shortener().short(url)
@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+'''
+비디오 생성 작업 큐.
+요청 스레드에서 렌더링하지 않고 작업을 큐에 넣은 뒤 작업 ID 를 바로 돌려줍니다.
+작업 상태는 작업마다 JSON 파일(video_jobs/<id>/job.json)로 저장되므로, gunicorn 의 다른 워커 프로세스에서도 조회할 수 있습니다.
+렌더링은 크기가 정해진 워커 풀에서 실행되고, 대기 작업이 max_pending 을 넘으면 새 작업을 받지 않습니다.
+
+상태: queued -> running -> done | failed
+'''
+logger = logging.getLogger(__name__)
+
+JOB_DIR = 'video_jobs'
+JOB_FILE = 'job.json'
+JOB_TTL = 24 * 3600  # 끝난 작업을 보관하는 시간(초)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class QueueFullError(Exception):
+    """대기 중인 작업이 너무 많아 새 작업을 받을 수 없는 경우."""
+
+
+def is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class JobStore:
+    """
+    File-backed job records, one JSON file per job directory.
+    Writes are atomic (temp file + rename) so readers in other processes never see a partial file.
+    """
+    def __init__(self, root: str = JOB_DIR, ttl: float = JOB_TTL):
+        self.root = root
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def get_dir(self, job_id: str) -> str:
+        return os.path.join(self.root, job_id)
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.get_dir(job_id), JOB_FILE)
+
+    def _write(self, job: dict) -> None:
+        path = self._path(job['id'])
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(job, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def create(self, params: dict) -> dict:
+        job_id = uuid.uuid4().hex
+        os.makedirs(self.get_dir(job_id), exist_ok=True)
+        now = time.time()
+        job = {
+            'id': job_id,
+            'state': QUEUED,
+            'progress': 0,
+            'message': '대기 중',
+            'created_at': now,
+            'updated_at': now,
+            'pid': os.getpid(),
+            'result': None,
+            'error': None,
+        }
+        with self._lock:
+            self._write(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        # 작업 ID 는 uuid hex 만 허용 (경로 조작 방지)
+        if not job_id or not all(c in '0123456789abcdef' for c in job_id):
+            return None
+        try:
+            with open(self._path(job_id), 'r', encoding='utf-8') as f:
+                job = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # 작업을 실행하던 프로세스가 종료되었으면 실패로 처리
+        if job['state'] in (QUEUED, RUNNING) and not is_process_alive(job.get('pid', 0)):
+            job = self.update(job_id, state=FAILED, error='작업을 처리하던 프로세스가 종료되었습니다.') or job
+        return job
+
+    def update(self, job_id: str, **fields) -> Optional[dict]:
+        with self._lock:
+            try:
+                with open(self._path(job_id), 'r', encoding='utf-8') as f:
+                    job = json.load(f)
+            except (OSError, ValueError):
+                return None
+            job.update(fields)
+            job['updated_at'] = time.time()
+            self._write(job)
+            return job
+
+    def purge_expired(self) -> None:
+        """보관 시간이 지난 끝난 작업을 디렉토리째 삭제합니다."""
+        now = time.time()
+        for job_id in os.listdir(self.root):
+            try:
+                with open(self._path(job_id), 'r', encoding='utf-8') as f:
+                    job = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if job['state'] in (DONE, FAILED) and now - job['updated_at'] > self.ttl:
+                shutil.rmtree(self.get_dir(job_id), ignore_errors=True)
+
+
+class JobQueue:
+    """
+    Runs `handler(job_id, params, progress)` on a bounded worker pool and records the
+    outcome in a JobStore. `handler` returns the job result dict or raises.
+    """
+    def __init__(self, store: JobStore, handler: Callable, max_workers: int = 1, max_pending: int = 20):
+        self.store = store
+        self.handler = handler
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='video-job')
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, params: dict) -> dict:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFullError(f"대기 중인 작업이 너무 많습니다. ({self._pending})")
+            self._pending += 1
+        try:
+            self.store.purge_expired()
+            job = self.store.create(params)
+            self._executor.submit(self._run, job['id'], params)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        return job
+
+    def _run(self, job_id: str, params: dict) -> None:
+        def progress(percent: int, message: str) -> None:
+            self.store.update(job_id, progress=percent, message=message)
+
+        try:
+            self.store.update(job_id, state=RUNNING, message='작업 시작')
+            result = self.handler(job_id, params, progress)
+            self.store.update(job_id, state=DONE, progress=100, message='완료', result=result)
+        except Exception as e:
+            logger.error(f"Video job {job_id} failed: {e}")
+            self.store.update(job_id, state=FAILED, message='실패', error=str(e),
+                              details=getattr(e, 'details', None))
+        finally:
+            with self._lock:
+                self._pending -= 1
@@ -0,0 +1,326 @@
+import os
+import math
+import base64
+import hashlib
+import shutil
+import logging
+import subprocess
+from typing import Callable, List, Optional
+from media_assets import fetch_assets
+from render_cache import RenderCache, make_key, file_digest
+
+'''
+이미지 배열을 FFmpeg 로 비디오로 만드는 렌더러.
+api_server 의 /api/video/generate 요청 안에서 하던 작업(이미지 다운로드, FFmpeg 실행)을 분리한 것으로,
+작업 큐(video_jobs)의 워커 스레드에서 실행됩니다.
+'''
+logger = logging.getLogger(__name__)
+
+# 해상도 설정
+RESOLUTION_MAP = {
+    'landscape': (1920, 1080),  # 16:9 가로
+    'portrait': (1080, 1920),   # 9:16 세로 (숏츠)
+    'square': (1080, 1080)      # 1:1 정사각형
+}
+# 품질 설정
+CRF_MAP = {'low': 28, 'medium': 23, 'high': 18}
+OUTPUT_FILENAME = 'output.mp4'
+# x264 프리셋. 정지 이미지 영상은 빠른 프리셋으로도 화질 차이가 거의 없음 (VIDEO_X264_PRESET)
+X264_PRESET = os.environ.get('VIDEO_X264_PRESET', 'veryfast')
+AUDIO_FILTER = 'volume=2.0'  # 오디오 볼륨 2배
+# 렌더링 방식이 바뀌면 올려서 이전 캐시를 사용하지 않도록 함
+RENDER_VERSION = 1
+# 결과에 영향을 주는 요청 값
+RENDER_PARAMS = ('duration', 'durations', 'fps', 'quality', 'resolution', 'sync_audio', 'target_duration', 'total_duration')
+
+
+class VideoRenderError(Exception):
+    """요청 값이 잘못되었거나(status 400) 렌더링에 실패한 경우(status 500)."""
+    def __init__(self, message: str, status: int = 500, details: Optional[str] = None):
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+
+def check_ffmpeg() -> bool:
+    """FFmpeg 설치 확인"""
+    try:
+        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
+        return True
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return False
+
+
+def validate_params(data: Optional[dict]) -> None:
+    """작업을 큐에 넣기 전에 요청 값을 확인합니다. 잘못되었으면 VideoRenderError(status=400)."""
+    if not data:
+        raise VideoRenderError("No JSON data provided", 400)
+    if not data.get('images'):
+        raise VideoRenderError("이미지가 필요합니다", 400)
+    durations = data.get('durations')
+    if durations is not None and (not isinstance(durations, list) or len(durations) != len(data['images'])):
+        raise VideoRenderError("durations 는 images 와 같은 길이의 배열이어야 합니다", 400)
+    if durations is not None and not all(
+            isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+            for value in durations):
+        raise VideoRenderError("durations 의 값은 모두 숫자(초)여야 합니다", 400)
+
+
+def get_source_id(source: str) -> str:
+    """data: URL 은 내용의 해시로, 그 외(URL)는 그대로 사용합니다."""
+    if source.startswith('data:'):
+        return 'sha256:' + hashlib.sha256(source.encode('utf-8')).hexdigest()
+    return source
+
+
+def get_render_options(data: dict) -> dict:
+    return {name: data.get(name) for name in RENDER_PARAMS} | {'preset': X264_PRESET, 'version': RENDER_VERSION}
+
+
+def get_request_key(data: dict) -> Optional[str]:
+    """
+    정규화한 요청으로 만든 캐시 키. 이미지를 받기 전에 바로 캐시를 확인하는 데 사용합니다.
+    URL 입력은 같은 주소라도 내용이 바뀔 수 있으므로, 모든 입력이 data: URL 일 때만 키를 만들고 아니면 None.
+    """
+    sources = list(data.get('images', [])) + ([data['audio_url']] if data.get('audio_url') else [])
+    if not all(isinstance(source, str) and source.startswith('data:') for source in sources):
+        return None
+    return make_key('video-request', get_render_options(data),
+                    [get_source_id(image) for image in data.get('images', [])],
+                    get_source_id(data.get('audio_url') or ''))
+
+
+def probe_duration(path: str) -> Optional[float]:
+    """ffprobe 로 미디어 길이(초)를 확인합니다. 실패하면 None."""
+    try:
+        probe_cmd = [
+            'ffprobe', '-v', 'quiet', '-show_entries', 'format=duration',
+            '-of', 'csv=p=0', path
+        ]
+        probe_result = subprocess.run(probe_cmd, capture_output=True, text=True)
+        if probe_result.returncode == 0:
+            return float(probe_result.stdout.strip())
+    except Exception as e:
+        logger.warning(f"Could not probe duration: {e}")
+    return None
+
+
+def unify_image_formats(paths: List[str]) -> List[str]:
+    """
+    concat demuxer 는 모든 입력의 코덱이 같아야 하므로, 가장 많은 형식과 다른 이미지만 그 형식으로 변환합니다.
+    (크기는 바꾸지 않음. 크기/여백은 FFmpeg 필터에서 한 번에 처리)
+    """
+    extensions = [os.path.splitext(path)[1].lower() for path in paths]
+    target = max(set(extensions), key=extensions.count)
+    if all(extension == target for extension in extensions):
+        return paths
+    from PIL import Image
+    pil_format = {'.jpg': 'JPEG', '.png': 'PNG', '.webp': 'WEBP', '.gif': 'GIF', '.bmp': 'BMP'}.get(target, 'PNG')
+    unified = []
+    for path, extension in zip(paths, extensions):
+        if extension == target:
+            unified.append(path)
+            continue
+        new_path = os.path.splitext(path)[0] + target
+        with Image.open(path) as image:
+            image = image.convert('RGB') if pil_format == 'JPEG' else image.convert('RGBA')
+            image.save(new_path, format=pil_format, quality=95)
+        unified.append(new_path)
+    return unified
+
+
+def write_concat_script(paths: List[str], durations: List[float], script_path: str) -> None:
+    """장면별 이미지와 길이를 concat demuxer 스크립트로 작성합니다."""
+    def quote(path: str) -> str:
+        return "'" + os.path.abspath(path).replace("'", "'\\''") + "'"
+
+    lines = ['ffconcat version 1.0']
+    for path, scene_duration in zip(paths, durations):
+        lines.append(f'file {quote(path)}')
+        lines.append(f'duration {scene_duration:.3f}')
+    # 마지막 장면의 duration 이 적용되도록 마지막 파일을 한 번 더 적음 (concat demuxer 특성)
+    lines.append(f'file {quote(paths[-1])}')
+    with open(script_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def render_video(data: dict, work_dir: str, progress: Optional[Callable[[int, str], None]] = None,
+                 cache: Optional[RenderCache] = None) -> dict:
+    """
+    요청 값(data)으로 비디오를 만들어 work_dir/output.mp4 에 저장합니다.
+    이미지는 concat demuxer 스크립트 하나로 읽어 스케일/여백 필터를 한 번만 적용하고,
+    오디오 처리(볼륨)와 결합도 같은 FFmpeg 실행에서 합니다.
+    progress(percent, message) 로 진행 상황을 알리고, 결과로 {'path', 'metadata', 'ffmpeg_log', 'cache_key', 'cached'} 를 반환합니다.
+    cache 가 있으면 받은 입력 파일의 해시로 캐시를 확인하고, 있으면 인코딩 없이 캐시된 파일을 사용합니다
+    (이때 'cached_data' 에 캐시에 저장했던 값이 들어있습니다).
+    실패하면 VideoRenderError 를 발생시킵니다.
+    """
+    def report(percent: int, message: str) -> None:
+        if progress:
+            progress(percent, message)
+
+    validate_params(data)
+    images = data.get('images', [])
+    duration = data.get('duration', 3)
+    durations = data.get('durations')  # 장면별 길이 (선택사항)
+    fps = data.get('fps', 30)
+    quality = data.get('quality', 'medium')
+    resolution = data.get('resolution', 'landscape')  # landscape, portrait, square
+    audio_url = data.get('audio_url', '')  # 오디오 파일 (선택사항)
+    sync_audio = data.get('sync_audio', False)  # 오디오 싱크 활성화
+    target_duration = data.get('target_duration', None)  # 목표 영상 길이
+    total_duration = data.get('total_duration', None)  # 전체 영상 길이
+
+    # 임시 디렉토리 생성
+    temp_dir = os.path.join(work_dir, 'tmp')
+    os.makedirs(temp_dir, exist_ok=True)
+    output_path = os.path.join(work_dir, OUTPUT_FILENAME)
+    width, height = RESOLUTION_MAP.get(resolution, (1920, 1080))
+
+    try:
+        report(5, '이미지 다운로드 중')
+        # 이미지를 동시에 받되 장면 순서는 유지. 실패한 이미지는 건너뛰고 메타데이터에 기록
+        assets = fetch_assets(images, temp_dir)
+        scenes = [asset for asset in assets if asset.ok]
+        failed_images = [asset.to_dict() for asset in assets if not asset.ok]
+
+        # 이미지 처리 확인
+        if not scenes:
+            raise VideoRenderError(f"이미지 처리 실패: {len(images)}개 중 0개만 처리됨", 400)
+
+        logger.info(f"Successfully processed {len(scenes)} images")
+
+        # 장면별 길이 계산
+        if durations is not None:
+            scene_durations = [max(0.1, float(durations[asset.index])) for asset in scenes]
+        else:
+            if sync_audio and total_duration:
+                # 오디오 길이에 맞춰 각 장면의 길이 계산
+                duration = max(1, total_duration / len(scenes))
+                logger.info(f"Audio sync enabled: {len(scenes)} images, {total_duration}s total, {duration:.2f}s per scene")
+            elif target_duration:
+                # 목표 길이에 맞춰 장면 길이 계산
+                duration = max(1, target_duration / len(scenes))
+                logger.info(f"Target duration: {len(scenes)} images, {target_duration}s total, {duration:.2f}s per scene")
+            scene_durations = [duration] * len(scenes)
+
+        # 계산된 총 영상 길이
+        calculated_video_duration = sum(scene_durations)
+
+        # 오디오 파일 저장
+        audio_path = None
+        audio_duration = None
+        if audio_url:
+            if audio_url.startswith('data:audio'):
+                header, encoded = audio_url.split(',', 1)
+                audio_path = os.path.join(temp_dir, 'audio.mp3')
+                with open(audio_path, 'wb') as f:
+                    f.write(base64.b64decode(encoded))
+            else:
+                logger.warning(f"Unsupported audio format: {audio_url[:50]}...")
+
+        # 입력 파일 내용과 렌더링 옵션으로 만든 캐시 키. 같은 결과가 있으면 인코딩하지 않음
+        cache_key = make_key('video', get_render_options(data), scene_durations,
+                             [file_digest(asset.path) for asset in scenes],
+                             file_digest(audio_path) if audio_path else None)
+        cached_data = cache.fetch(cache_key, output_path) if cache is not None else None
+        if cached_data is not None:
+            logger.info(f"Render cache hit: {cache_key}")
+            metadata = dict(cached_data.get('metadata', {}))
+            metadata['failed_images'] = failed_images
+            return {
+                'path': output_path,
+                'metadata': metadata,
+                'ffmpeg_log': 'render cache hit',
+                'cache_key': cache_key,
+                'cached': True,
+                'cached_data': cached_data,
+            }
+
+        if audio_path:
+            audio_duration = probe_duration(audio_path)
+            if audio_duration is not None:
+                logger.info(f"Audio duration detected: {audio_duration:.2f}s")
+
+        image_paths = unify_image_formats([asset.path for asset in scenes])
+        script_path = os.path.join(temp_dir, 'scenes.txt')
+        write_concat_script(image_paths, scene_durations, script_path)
+
+        crf = CRF_MAP.get(quality, 23)
+
+        # 스케일/여백/프레임레이트를 한 번만 적용하는 필터
+        filters = [
+            f'[0:v]scale={width}:{height}:force_original_aspect_ratio=decrease,'
+            f'pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={fps},format=yuv420p[v]'
+        ]
+        cmd = ['ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', script_path]
+        maps = ['-map', '[v]']
+        if audio_path:
+            cmd.extend(['-i', audio_path])
+            # 오디오 전처리(볼륨, 샘플레이트, 싱크 보정)를 같은 실행에서 처리
+            audio_filter = f'[1:a]{AUDIO_FILTER},aresample=44100'
+            if sync_audio:
+                audio_filter += ':async=1'
+            filters.append(audio_filter + '[a]')
+            maps.extend(['-map', '[a]', '-c:a', 'aac', '-b:a', '192k', '-ac', '2'])
+
+        cmd.extend([
+            '-filter_complex', ';'.join(filters),
+            *maps,
+            '-c:v', 'libx264',
+            '-preset', X264_PRESET,
+            '-tune', 'stillimage',
+            '-crf', str(crf),
+            '-r', str(fps),
+            '-movflags', '+faststart',  # 웹 스트리밍 최적화
+        ])
+        if audio_path and sync_audio and audio_duration is not None:
+            # 오디오 싱크 모드: 오디오 길이에 맞춰 비디오 조정
+            logger.info(f"Syncing video duration {calculated_video_duration:.2f}s to audio duration {audio_duration:.2f}s")
+            cmd.extend(['-t', str(audio_duration)])
+        elif audio_path and not sync_audio:
+            # 기본 모드: 더 짧은 쪽에 맞춤
+            cmd.extend(['-t', str(calculated_video_duration), '-shortest'])
+        else:
+            cmd.extend(['-t', str(calculated_video_duration)])
+        cmd.append(output_path)
+
+        report(20, '비디오 생성 중')
+        logger.info(f"FFmpeg command: {' '.join(cmd)}")
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+
+    except subprocess.CalledProcessError as e:
+        logger.error(f"FFmpeg execution failed: {e.stderr}")
+        raise VideoRenderError("FFmpeg 실행 실패", 500, e.stderr)
+    finally:
+        # 임시 파일 정리
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    # 최종 메타데이터 계산
+    final_duration = audio_duration if audio_path and audio_duration is not None else calculated_video_duration
+    scene_duration = final_duration / len(scenes)
+
+    return {
+        'path': output_path,
+        'metadata': {
+            "duration": final_duration,
+            "calculated_video_duration": calculated_video_duration,
+            "audio_duration": audio_duration if audio_url else None,
+            "scene_duration": scene_duration,
+            "scene_durations": scene_durations,
+            "fps": fps,
+            "sync_audio": sync_audio,
+            "images_count": len(images),
+            "resolution": f"{width}x{height}",
+            "resolution_type": resolution,
+            "quality": quality,
+            "file_size": os.path.getsize(output_path),
+            "image_count": len(images),
+            "has_audio": bool(audio_path),
+            "audio_included": bool(audio_path),
+            "failed_images": failed_images,
+        },
+        'ffmpeg_log': result.stderr,
+        'cache_key': cache_key,
+        'cached': False,
+    }